@@ -1,12 +1,65 @@
 """2048 Gmae"""  # pylint: disable=C0103
 
-from src.Game import Game
+import argparse
+from contextlib import ExitStack
+from pathlib import Path
+from src.Profiler import StartupProfiler
+from src.ReplayLog import GameRecord, ReplayWriter, readGames
+from src.Snapshot import AUTOSAVE, Autosave, Snapshot, loadSnapshot
+from src.Utils import Screens
 
 
 def main() -> None:
     """Entry point of the game"""
-    with Game() as g:
-        g.mainloop()
+    parser = argparse.ArgumentParser(
+        description="The game 2048",
+        epilog="With --headless the game is not shown and the options of tournament.py are accepted",
+    )
+    parser.add_argument("--headless", action="store_true", help="play games with a policy without a window")
+    parser.add_argument(
+        "--profile-startup", action="store_true", help="report the time of each startup phase to stderr"
+    )
+    parser.add_argument("--fps", type=int, default=60, help="maximum number of times per second the board is drawn")
+    parser.add_argument("--animate", action="store_true", help="slide the tiles on a canvas instead of labels")
+    parser.add_argument("--record", default=None, help="binary replay log to append the games to")
+    parser.add_argument("--replay", default=None, help="binary replay log with the games to watch")
+    parser.add_argument("--save", type=Path, default=AUTOSAVE, help="file where the game is saved after every move")
+    parser.add_argument("--no-autosave", action="store_true", help="do not resume the last game nor save this one")
+    args, rest = parser.parse_known_args()
+
+    if args.headless:
+        from src.Tournament import runCommandLine  # pylint: disable=C0415
+
+        if args.record is not None:
+            rest += ["--record", args.record]
+        runCommandLine(rest, prog=f"{parser.prog} --headless")
+        return
+    if args.fps <= 0:
+        parser.error("the frame rate must be positive")
+    if rest:
+        parser.error(f"unrecognized arguments: {' '.join(rest)}")
+
+    replays: list[GameRecord] = []
+    if args.replay is not None:
+        with open(args.replay, "rb") as log:
+            replays = list(readGames(log))
+
+    resume: Snapshot | None = None if args.no_autosave else loadSnapshot(args.save)
+
+    profiler: StartupProfiler | None = StartupProfiler() if args.profile_startup else None
+    from src.Game import Game  # pylint: disable=C0415
+
+    if profiler is not None:
+        profiler.mark("import")
+    with ExitStack() as stack:
+        recorder: ReplayWriter | None = None
+        if args.record is not None:
+            recorder = stack.enter_context(ReplayWriter(stack.enter_context(open(args.record, "ab"))))
+        autosave: Autosave | None = None if args.no_autosave else stack.enter_context(Autosave(args.save))
+        with Game(profiler, args.fps, args.animate, recorder, replays, autosave, resume) as g:
+            if replays:
+                g.showScreen(Screens.REPLAY)
+            g.mainloop()
 
 
 if __name__ == "__main__":
@@ -0,0 +1,13 @@
+"""Microbenchmarks of the 2048 engine"""
+
+import sys
+from src.Benchmark import runCommandLine
+
+
+def main() -> None:
+    """Entry point of the benchmarks"""
+    sys.exit(runCommandLine())
+
+
+if __name__ == "__main__":
+    main()
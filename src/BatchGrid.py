@@ -0,0 +1,156 @@
+"""Module to play many grids at once with numpy"""
+
+from random import Random
+from typing import Sequence
+import numpy as np
+from src.SpawnStream import SpawnStream
+from src.Utils import Directions
+
+
+class BatchGrid:
+    """
+    N grids stored in an (N, size, size) array of tile values
+
+    Every board can move in its own direction, the boards are grouped by direction and each group
+    is moved in a single vectorized pass.
+
+    Every board has its own seed in seeds, derived from the batch seed, and draws its new tiles from
+    its own SpawnStream. A board plays the same game as a GameState with its seed, whatever the other
+    boards do.
+    """
+
+    def __init__(self, boards: int, size: int = 4, win: int = 2048, seed: int | None = None) -> None:
+        self.size: int = size
+        self.win: int = win
+        self.grid: np.ndarray = np.zeros((boards, size, size), dtype=np.int64)
+        self.score: np.ndarray = np.zeros(boards, dtype=np.int64)
+        master: int = seed if seed is not None else Random().getrandbits(64)
+        self.seeds: list[int] = [Random(f"{master}:{board}").getrandbits(64) for board in range(boards)]
+        self.spawns: list[SpawnStream] = [SpawnStream(board_seed) for board_seed in self.seeds]
+
+    def __len__(self) -> int:
+        return self.grid.shape[0]
+
+    def __getitem__(self, key: int) -> np.ndarray:
+        return self.grid[key]
+
+    @staticmethod
+    def _toLeft(boards: np.ndarray, direction: Directions) -> np.ndarray:
+        """View the boards so that the direction becomes a movement to the left"""
+        match direction:
+            case Directions.Left:
+                return boards
+            case Directions.Right:
+                return boards[:, :, ::-1]
+            case Directions.Up:
+                return boards.transpose(0, 2, 1)
+            case Directions.Down:
+                return boards.transpose(0, 2, 1)[:, :, ::-1]
+
+    @staticmethod
+    def _fromLeft(boards: np.ndarray, direction: Directions) -> np.ndarray:
+        """Undo the view made by _toLeft"""
+        if direction == Directions.Down:
+            return boards[:, :, ::-1].transpose(0, 2, 1)
+        return BatchGrid._toLeft(boards, direction)
+
+    def _slideLeft(self, rows: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+        """
+        Slide and merge rows to the left
+
+        Args:
+            rows (np.ndarray): (M, size) array of tile values
+
+        Returns:
+            tuple[np.ndarray, np.ndarray]: the moved rows and the score of each row
+        """
+        order: np.ndarray = np.argsort(rows == 0, axis=1, kind="stable")
+        rows = np.take_along_axis(rows, order, axis=1)
+        score: np.ndarray = np.zeros(rows.shape[0], dtype=np.int64)
+        for j in range(self.size - 1):
+            merge: np.ndarray = (rows[:, j] == rows[:, j + 1]) & (rows[:, j] != 0)
+            if not merge.any():
+                continue
+            rows[merge, j] *= 2
+            score[merge] += rows[merge, j]
+            rows[merge, j + 1 : -1] = rows[merge, j + 2 :]
+            rows[merge, -1] = 0
+        return rows, score
+
+    def move(self, directions: Sequence[int] | np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+        """
+        Move every board in its own direction
+
+        Args:
+            directions (Sequence[int] | np.ndarray): the Directions value for each board
+
+        Returns:
+            tuple[np.ndarray, np.ndarray]: if each board has moved and the score each one has made
+        """
+        directions = np.asarray(directions)
+        moved: np.ndarray = np.zeros(len(self), dtype=bool)
+        scores: np.ndarray = np.zeros(len(self), dtype=np.int64)
+        for direction in Directions:
+            indices: np.ndarray = np.flatnonzero(directions == direction.value)
+            if indices.size == 0:
+                continue
+            view: np.ndarray = self._toLeft(self.grid[indices], direction)
+            rows, score = self._slideLeft(view.reshape(-1, self.size))
+            result: np.ndarray = self._fromLeft(rows.reshape(view.shape), direction)
+            moved[indices] = (result != self.grid[indices]).any(axis=(1, 2))
+            scores[indices] = score.reshape(-1, self.size).sum(axis=1)
+            self.grid[indices] = result
+        self.score += scores
+        return moved, scores
+
+    def newTiles(self, mask: np.ndarray | None = None) -> None:
+        """
+        Generate a new tile in an empty cell of the selected boards that have space
+
+        Each board takes the next numbers of its own stream and picks the k-th empty cell in reading
+        order, like Grid.emptyCell.
+
+        Args:
+            mask (np.ndarray | None): the boards to add a tile to, all of them by default
+        """
+        flat: np.ndarray = self.grid.reshape(len(self), -1)
+        empty: np.ndarray = flat == 0
+        selected: np.ndarray = empty.any(axis=1)
+        if mask is not None:
+            selected &= mask
+        indices: np.ndarray = np.flatnonzero(selected)
+        if indices.size == 0:
+            return
+        numbers: np.ndarray = np.array([self.spawns[board].next() for board in indices.tolist()])
+        counts: np.ndarray = empty[indices].cumsum(axis=1)
+        k: np.ndarray = (numbers[:, 0] * counts[:, -1]).astype(np.int64)
+        cells: np.ndarray = (counts > k[:, None]).argmax(axis=1)
+        flat[indices, cells] = np.where(numbers[:, 1] < 0.8, 2, 4)
+
+    def isEndgame(self) -> np.ndarray:
+        """Check which boards have reached the win tile or can not move anymore"""
+        won: np.ndarray = (self.grid >= self.win).any(axis=(1, 2))
+        space: np.ndarray = (self.grid == 0).any(axis=(1, 2))
+        horizontal: np.ndarray = (self.grid[:, :, 1:] == self.grid[:, :, :-1]).any(axis=(1, 2))
+        vertical: np.ndarray = (self.grid[:, 1:, :] == self.grid[:, :-1, :]).any(axis=(1, 2))
+        return won | ~(space | horizontal | vertical)
+
+    def step(self, directions: Sequence[int] | np.ndarray) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """
+        Move every board, add a new tile to the ones that have moved and check the endgame
+
+        Args:
+            directions (Sequence[int] | np.ndarray): the Directions value for each board
+
+        Returns:
+            tuple[np.ndarray, np.ndarray, np.ndarray]: the moved flags, the scores and the terminal flags
+        """
+        moved, scores = self.move(directions)
+        self.newTiles(moved)
+        return moved, scores, self.isEndgame()
+
+    def reset(self) -> None:
+        """Reset every board, the new tiles start again from the beginning of each stream"""
+        self.grid[:] = 0
+        self.score[:] = 0
+        self.spawns = [SpawnStream(board_seed) for board_seed in self.seeds]
@@ -0,0 +1,306 @@
+"""Module with microbenchmarks of the engine and of the work done for every key press"""
+
+import argparse
+import json
+import platform
+from random import Random
+import statistics
+import sys
+import time
+from typing import Any, Callable, NamedTuple, TextIO
+from src.GameState import GameState
+from src.Grid import Grid, slideLine, slideTargets
+from src.History import History
+from src.Utils import Color, Directions, palette
+
+CORPUS: int = 256
+SEED: int = 2048
+
+
+class Case(NamedTuple):
+    """
+    A benchmark: prepare builds the inputs outside of the timing, run does ops operations on them
+    """
+
+    name: str
+    prepare: Callable[[], Any]
+    run: Callable[[Any], None]
+    ops: int
+
+
+class Result(NamedTuple):
+    """Operations per second of every repetition of a benchmark"""
+
+    name: str
+    rates: list[float]
+
+    @property
+    def mean(self) -> float:
+        """Average operations per second"""
+        return statistics.fmean(self.rates)
+
+    @property
+    def stdev(self) -> float:
+        """Standard deviation of the operations per second"""
+        return statistics.stdev(self.rates) if len(self.rates) > 1 else 0
+
+    def asDict(self) -> dict[str, Any]:
+        """The result ready to be saved as JSON"""
+        return {
+            "mean": self.mean,
+            "stdev": self.stdev,
+            "min": min(self.rates),
+            "max": max(self.rates),
+            "repeats": len(self.rates),
+        }
+
+
+def boards(size: int = 4, count: int = CORPUS, seed: int = SEED) -> list[list[list[int]]]:
+    """A fixed corpus of boards with some empty cells, the same seed always gives the same boards"""
+    rng: Random = Random(f"{seed}:{size}")
+    tiles: tuple[int, ...] = (0, 0, 0, 2, 2, 4, 4, 8, 16, 32, 64, 128)
+    return [[[rng.choice(tiles) for _ in range(size)] for _ in range(size)] for _ in range(count)]
+
+
+def _grids(size: int = 4) -> list[Grid]:
+    grids: list[Grid] = []
+    for board in boards(size):
+        grid: Grid = Grid(size)
+        grid.grid = board
+        grids.append(grid)
+    return grids
+
+
+def _states() -> list[GameState]:
+    states: list[GameState] = []
+    for seed, board in enumerate(boards()):
+        state: GameState = GameState(seed=seed)
+        state.setGrid(board)
+        states.append(state)
+    return states
+
+
+def _coldGrids() -> list[Grid]:
+    """The corpus with the caches of the lines emptied, otherwise every repetition after the first only hits them"""
+    slideLine.cache_clear()
+    slideTargets.cache_clear()
+    return _grids()
+
+
+def _moveCase(direction: Directions) -> Case:
+    def run(grids: list[Grid]) -> None:
+        for grid in grids:
+            move(grid)
+
+    move: Callable[[Grid], bool] = {
+        Directions.Up: Grid.up,
+        Directions.Left: Grid.left,
+        Directions.Down: Grid.down,
+        Directions.Right: Grid.right,
+    }[direction]
+    return Case(f"grid.move.{direction.name.lower()}", _coldGrids, run, CORPUS)
+
+
+def _lines() -> list[tuple[int, ...]]:
+    return [tuple(row) for board in boards() for row in board]
+
+
+def _slideLine(lines: list[tuple[int, ...]]) -> None:
+    for line in lines:
+        slideLine(line)
+
+
+def _slideLineUncached(lines: list[tuple[int, ...]]) -> None:
+    slide: Callable[[tuple[int, ...]], tuple[tuple[int, ...], int]] = slideLine.__wrapped__
+    for line in lines:
+        slide(line)
+
+
+def _isEndgame(states: list[GameState]) -> None:
+    for state in states:
+        state.isEndgame()
+
+
+def _newTile(states: list[GameState]) -> None:
+    for state in states:
+        state.newTile()
+
+
+def _colors() -> tuple[Color, list[tuple[int, float, float]]]:
+    rng: Random = Random(SEED)
+    return Color(0, 0, 0), [(rng.randrange(256), 100, rng.uniform(0, 100)) for _ in range(CORPUS)]
+
+
+def _hsl2rgb(inputs: tuple[Color, list[tuple[int, float, float]]]) -> None:
+    color, values = inputs
+    for hue, saturation, lightness in values:
+        color._hsl2rgb(hue, saturation, lightness)  # pylint: disable=W0212
+
+
+def _palette(_: None) -> None:
+    generate = palette.__wrapped__
+    for hue in range(0, 256, 16):
+        generate(2048, hue, 100, 66.4)
+
+
+def _keypresses() -> tuple[GameState, History, list[Directions]]:
+    rng: Random = Random(SEED)
+    state: GameState = GameState(seed=SEED)
+    state.grid.track_dirty = True
+    return state, History(), [rng.choice(list(Directions)) for _ in range(CORPUS)]
+
+
+def _keypress(inputs: tuple[GameState, History, list[Directions]]) -> None:
+    """What GameScreen does for a key without Tk: move, check the endgame, add a tile, keep the history"""
+    state, history, directions = inputs
+    for direction in directions:
+        moved: bool = state.move(direction)
+        if state.isEndgame():
+            state.reset(SEED)
+            history.clear()
+        elif moved:
+            state.newTile()
+            history.push(*state.checkpoint())
+        state.grid.takeDirty()
+
+
+CASES: list[Case] = [
+    *(_moveCase(direction) for direction in Directions),
+    Case("slideLine", _lines, _slideLine, 4 * CORPUS),
+    Case("slideLine.uncached", _lines, _slideLineUncached, 4 * CORPUS),
+    Case("state.isEndgame", _states, _isEndgame, CORPUS),
+    Case("state.newTile", _states, _newTile, CORPUS),
+    Case("color.hsl2rgb", _colors, _hsl2rgb, CORPUS),
+    Case("palette.uncached", lambda: None, _palette, 16),
+    Case("keypress", _keypresses, _keypress, CORPUS),
+]
+
+
+def runCase(case: Case, repeats: int = 7, warmup: int = 1) -> Result:
+    """
+    Time a benchmark, the inputs are prepared again before every repetition
+
+    A repetition too short for the clock is run again until some time has passed.
+
+    Args:
+        case (Case): the benchmark
+        repeats (int): number of timed repetitions
+        warmup (int): number of repetitions run before the timed ones
+
+    Returns:
+        Result: the operations per second of each timed repetition
+    """
+    rates: list[float] = []
+    for repetition in range(warmup + repeats):
+        runs: int = 0
+        elapsed: float = 0
+        while elapsed <= 0:
+            inputs: Any = case.prepare()
+            start: float = time.perf_counter()
+            case.run(inputs)
+            elapsed += time.perf_counter() - start
+            runs += 1
+        if repetition >= warmup:
+            rates.append(runs * case.ops / elapsed)
+    return Result(case.name, rates)
+
+
+def compare(
+    results: dict[str, dict[str, Any]],
+    baseline: dict[str, dict[str, Any]],
+    threshold: float = 0.1,
+    thresholds: dict[str, float] | None = None,
+) -> list[str]:
+    """
+    Find the benchmarks slower than the baseline
+
+    Args:
+        results (dict[str, dict[str, Any]]): the results by benchmark name
+        baseline (dict[str, dict[str, Any]]): the stored results by benchmark name
+        threshold (float): the fraction the mean can drop before it is a regression
+        thresholds (dict[str, float] | None): a different threshold for some benchmarks
+
+    Returns:
+        list[str]: a description of every regression
+    """
+    regressions: list[str] = []
+    for name, result in results.items():
+        if name not in baseline:
+            continue
+        limit: float = (thresholds or {}).get(name, threshold)
+        before: float = baseline[name]["mean"]
+        change: float = result["mean"] / before - 1
+        if change < -limit:
+            regressions.append(f"{name}: {result['mean']:.0f} ops/s, {100 * change:+.1f}% (limit -{100 * limit:.0f}%)")
+    return regressions
+
+
+def report(
+    results: dict[str, dict[str, Any]], output: TextIO, baseline: dict[str, dict[str, Any]] | None = None
+) -> None:
+    """Write the operations per second with their variation, and the change from the baseline"""
+    width: int = max((len(name) for name in results), default=0)
+    for name, result in results.items():
+        line: str = (
+            f"{name:<{width}}  {result['mean']:>14,.0f} ops/s  ± {100 * result['stdev'] / result['mean']:5.1f}%"
+        )
+        if baseline is not None and name in baseline:
+            line += f"  {100 * (result['mean'] / baseline[name]['mean'] - 1):+6.1f}%"
+        output.write(line + "\n")
+
+
+def _limit(text: str) -> tuple[str, float]:
+    """Parse a NAME=FRACTION threshold of the command line"""
+    name, separator, fraction = text.partition("=")
+    if not separator or not name:
+        raise argparse.ArgumentTypeError(f"expected NAME=FRACTION, got {text!r}")
+    try:
+        return name, float(fraction)
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"the fraction of {name} is not a number: {fraction!r}") from None
+
+
+def runCommandLine(argv: list[str] | None = None) -> int:
+    """
+    Run the benchmarks configured from command line arguments
+
+    Returns:
+        int: the exit code, 1 if there is any regression against the baseline
+    """
+    parser = argparse.ArgumentParser(description="Microbenchmarks of the 2048 engine")
+    parser.add_argument("--repeats", type=int, default=7, help="timed repetitions of every benchmark")
+    parser.add_argument("--filter", default="", help="only run the benchmarks whose name contains this text")
+    parser.add_argument("--output", type=argparse.FileType("w"), default=None, help="JSON file for the results")
+    parser.add_argument("--baseline", type=argparse.FileType("r"), default=None, help="JSON results to compare to")
+    parser.add_argument("--threshold", type=float, default=0.1, help="allowed drop of the mean, 0.1 is 10%%")
+    parser.add_argument(
+        "--limit",
+        type=_limit,
+        action="append",
+        default=[],
+        metavar="NAME=FRACTION",
+        help="allowed drop for a single benchmark, can be repeated",
+    )
+    args = parser.parse_args(argv)
+
+    thresholds: dict[str, float] = dict(args.limit)
+
+    results: dict[str, dict[str, Any]] = {
+        case.name: runCase(case, args.repeats).asDict() for case in CASES if args.filter in case.name
+    }
+    baseline: dict[str, dict[str, Any]] | None = None
+    if args.baseline is not None:
+        baseline = json.load(args.baseline)["results"]
+    report(results, sys.stdout, baseline)
+    if args.output is not None:
+        json.dump(
+            {"python": platform.python_version(), "platform": platform.platform(), "seed": SEED, "results": results},
+            args.output,
+            indent=2,
+        )
+    if baseline is None:
+        return 0
+    regressions: list[str] = compare(results, baseline, args.threshold, thresholds)
+    for regression in regressions:
+        sys.stdout.write(f"regression {regression}\n")
+    return 1 if regressions else 0
@@ -0,0 +1,447 @@
+"""Module with a bitboard version of the grid, packing the 16 tiles into a single int"""
+
+from collections.abc import Sequence
+from random import Random
+from src.Grid import slideLine, slideTargets
+from src.MoveTables import CELL_MASK, ROW_MASK, getTables
+from src.Utils import Directions
+
+LOW_BITS: int = 0x1111111111111111
+BYTE_LOW: int = 0x0F0F0F0F0F0F0F0F
+BYTE_ONES: int = 0x0101010101010101
+BYTE_CARRY: int = 0x1010101010101010
+HORIZONTAL_PAIRS: int = 0x0111011101110111
+VERTICAL_PAIRS: int = 0x0000111111111111
+
+
+def transpose(board: int) -> int:
+    """Swap rows and columns of a packed board"""
+    a1: int = board & 0xF0F00F0FF0F00F0F
+    a2: int = board & 0x0000F0F00000F0F0
+    a3: int = board & 0x0F0F00000F0F0000
+    a: int = a1 | (a2 << 12) | (a3 >> 12)
+    b1: int = a & 0xFF00FF0000FF00FF
+    b2: int = a & 0x00FF00FF00000000
+    b3: int = a & 0x00000000FF00FF00
+    return b1 | (b2 >> 24) | (b3 << 24)
+
+
+def toExponent(value: int) -> int:
+    """Get the 4 bit exponent of a tile value (0 for an empty cell)"""
+    return value.bit_length() - 1 if value else 0
+
+
+def toValue(exponent: int) -> int:
+    """Get the tile value of a 4 bit exponent"""
+    return 1 << exponent if exponent else 0
+
+
+MOVES: dict[Directions, tuple[bool, bool]] = {
+    Directions.Up: (False, True),
+    Directions.Left: (False, False),
+    Directions.Down: (True, True),
+    Directions.Right: (True, False),
+}
+
+
+def availableMoves(board: int) -> int:
+    """
+    Find the movements that would change a packed board
+
+    Returns:
+        int: mask with the bit 1 << direction.value set for every legal Directions
+    """
+    tables = getTables()
+    columns: int = transpose(board)
+    mask: int = 0
+    for shift in (0, 16, 32, 48):
+        row: int = (board >> shift) & ROW_MASK
+        column: int = (columns >> shift) & ROW_MASK
+        if tables.left_changed[row]:
+            mask |= 1 << Directions.Left.value
+        if tables.right_changed[row]:
+            mask |= 1 << Directions.Right.value
+        if tables.left_changed[column]:
+            mask |= 1 << Directions.Up.value
+        if tables.right_changed[column]:
+            mask |= 1 << Directions.Down.value
+    return mask
+
+
+def emptyMask(board: int) -> int:
+    """Mask with the lowest bit of every empty cell of a packed board set"""
+    board |= board >> 2
+    board |= board >> 1
+    return ~board & LOW_BITS
+
+
+def reaches(board: int, exponent: int) -> bool:
+    """If any cell of a packed board has an exponent of at least the given one"""
+    if exponent <= 0:
+        return True
+    if exponent > CELL_MASK:
+        return False
+    add: int = (16 - exponent) * BYTE_ONES
+    return bool((((board & BYTE_LOW) + add) | (((board >> 4) & BYTE_LOW) + add)) & BYTE_CARRY)
+
+
+def canMove(board: int) -> bool:
+    """If a packed board has an empty cell or two equal neighbours"""
+    if emptyMask(board):
+        return True
+    horizontal: int = emptyMask(board ^ (board >> 4)) & HORIZONTAL_PAIRS
+    vertical: int = emptyMask(board ^ (board >> 16)) & VERTICAL_PAIRS
+    return bool(horizontal or vertical)
+
+
+def pack(grid: Sequence[Sequence[int]]) -> int:
+    """
+    Pack a 4x4 grid of tile values into a board
+
+    Raises:
+        ValueError: if a tile does not fit in 4 bits
+    """
+    board: int = 0
+    for y, row in enumerate(grid):
+        for x, value in enumerate(row):
+            exponent: int = toExponent(value)
+            if exponent > CELL_MASK:
+                raise ValueError(f"A packed board can not hold a {value} tile")
+            board |= exponent << (4 * (4 * y + x))
+    return board
+
+
+def unpack(board: int) -> list[list[int]]:
+    """Unpack a board into a 4x4 grid of tile values"""
+    return [[toValue((board >> (4 * (4 * y + x))) & CELL_MASK) for x in range(4)] for y in range(4)]
+
+
+def moveBoard(board: int, *, positive: bool, vertical: bool) -> tuple[int, int]:
+    """
+    Move a packed board with the precomputed tables
+
+    Args:
+        board (int): the packed board
+        positive (bool): if the direction is on the positive axis (right or down)
+        vertical (bool): if the direction is vertical (up or down)
+
+    Returns:
+        tuple[int, int]: the packed board after the movement and the score of the merges
+    """
+    tables = getTables()
+    table = tables.right if positive else tables.left
+    score = tables.score
+    if vertical:
+        board = transpose(board)
+    row0: int = board & ROW_MASK
+    row1: int = (board >> 16) & ROW_MASK
+    row2: int = (board >> 32) & ROW_MASK
+    row3: int = board >> 48
+    result: int = table[row0] | (table[row1] << 16) | (table[row2] << 32) | (table[row3] << 48)
+    if vertical:
+        result = transpose(result)
+    return result, score[row0] + score[row1] + score[row2] + score[row3]
+
+
+class BitboardRow(Sequence[int]):
+    """A row of a BitboardGrid that reads and writes the cells of the packed board"""
+
+    def __init__(self, grid: "BitboardGrid", y: int) -> None:
+        self._grid: BitboardGrid = grid
+        self._y: int = y
+
+    def __len__(self) -> int:
+        return 4
+
+    def __getitem__(self, key: int | slice) -> int | list[int]:
+        if isinstance(key, slice):
+            return [self[x] for x in range(4)[key]]
+        x: int = range(4)[key]
+        return toValue((self._grid.board >> (4 * (4 * self._y + x))) & CELL_MASK)
+
+    def __setitem__(self, key: int, value: int) -> None:
+        self._grid.setTile(range(4)[key], self._y, value)
+
+    def __eq__(self, other: object) -> bool:
+        if isinstance(other, Sequence):
+            return list(self) == list(other)
+        return NotImplemented
+
+    def __repr__(self) -> str:
+        return repr(list(self))
+
+
+class BitboardGrid:
+    """
+    Grid that stores each tile as a 4 bit exponent inside a single int
+
+    The cell (x, y) lives in the bits [4 * (4y + x), 4 * (4y + x) + 4), so every row is a 16 bit
+    chunk. Tiles are limited to 2^15, two 32768 tiles will not merge. It has the interface of Grid,
+    so a GameState can play on it, but its size is always 4.
+    """
+
+    def __init__(self, win: int = 2048) -> None:
+        self.size: int = 4
+        self.win: int = win
+        self.board: int
+        self.score: int
+        self._empty_cells: int
+        self._drawn: int = 0
+        self._all_dirty: bool = True
+        self.track_dirty: bool = False
+        self.record_slides: bool = False
+        self.slides: list[tuple[int, int, int, int, int]] = []
+        self.available_space: bool
+        self.finished: bool
+
+        self.reset()
+
+    def __getitem__(self, key: int) -> BitboardRow:
+        return BitboardRow(self, range(4)[key])
+
+    @property
+    def grid(self) -> list[BitboardRow]:
+        """The rows of the board, writing a cell of a row writes the board"""
+        return [BitboardRow(self, y) for y in range(4)]
+
+    @grid.setter
+    def grid(self, grid: Sequence[Sequence[int]]) -> None:
+        if len(grid) != 4:
+            raise ValueError("A BitboardGrid is always 4x4")
+        self.board = pack(grid)
+        self._all_dirty = True
+
+    def setTile(self, x: int, y: int, value: int) -> None:
+        """
+        Set the value of a single cell
+
+        Raises:
+            ValueError: if the tile does not fit in 4 bits
+        """
+        exponent: int = toExponent(value)
+        if exponent > CELL_MASK:
+            raise ValueError(f"A BitboardGrid can not hold a {value} tile")
+        shift: int = 4 * (4 * y + x)
+        self.board = (self.board & ~(CELL_MASK << shift)) | (exponent << shift)
+        self.finished = self.won
+
+    def takeDirty(self) -> list[tuple[int, int]]:
+        """
+        Get the cells changed since the last call, every cell after the whole board has been replaced or
+        when track_dirty is not set
+
+        The changed cells come from comparing the board with the one of the last call, so writing a cell
+        costs nothing more.
+        """
+        if self._all_dirty or not self.track_dirty:
+            cells: list[tuple[int, int]] = [(x, y) for y in range(4) for x in range(4)]
+        else:
+            changed: int = ~emptyMask(self.board ^ self._drawn) & LOW_BITS
+            cells = []
+            while changed:
+                cell: int = (changed & -changed).bit_length() >> 2
+                cells.append((cell % 4, cell // 4))
+                changed &= changed - 1
+        self._drawn = self.board
+        self._all_dirty = False
+        return cells
+
+    def emptyCells(self) -> list[tuple[int, int]]:
+        """Coordinates (x, y) of the empty cells, in reading order"""
+        mask: int = emptyMask(self.board)
+        cells: list[tuple[int, int]] = []
+        while mask:
+            cell: int = (mask & -mask).bit_length() >> 2
+            cells.append((cell % 4, cell // 4))
+            mask &= mask - 1
+        return cells
+
+    @property
+    def emptyCount(self) -> int:
+        """Number of empty cells"""
+        return emptyMask(self.board).bit_count()
+
+    def emptyCell(self, fraction: float) -> tuple[int, int] | None:
+        """
+        Pick an empty cell from a number, the same cell Grid.emptyCell picks for the same tiles
+
+        Args:
+            fraction (float): a number in [0, 1) that selects the cell among the empty ones in reading order
+
+        Returns:
+            tuple[int, int] | None: the coordinates (x, y) of the cell or None if the board is full
+        """
+        mask: int = emptyMask(self.board)
+        if not mask:
+            return None
+        for _ in range(int(fraction * mask.bit_count())):
+            mask &= mask - 1
+        cell: int = (mask & -mask).bit_length() >> 2
+        return (cell % 4, cell // 4)
+
+    def randomEmptyCell(self, rng: Random) -> tuple[int, int] | None:
+        """
+        Pick an empty cell from the mask of empty cells
+
+        Args:
+            rng (Random): the random generator used to choose
+
+        Returns:
+            tuple[int, int] | None: the coordinates (x, y) of the cell or None if the board is full
+        """
+        return self.emptyCell(rng.random())
+
+    def availableMoves(self) -> int:
+        """
+        Find the movements that would change the board, without moving it
+
+        Returns:
+            int: mask with the bit 1 << direction.value set for every legal Directions
+        """
+        return availableMoves(self.board)
+
+    def peek(self, direction: Directions) -> tuple[list[list[int]], int]:
+        """
+        Compute a movement without changing the board, with the same result as Grid.peek
+
+        Args:
+            direction (Directions): the direction of the movement
+
+        Returns:
+            tuple[list[list[int]], int]: the rows after the movement and the score of the merges
+        """
+        board, score = self.peekBoard(direction)
+        return unpack(board), score
+
+    def peekBoard(self, direction: Directions) -> tuple[int, int]:
+        """
+        Compute a movement without changing the board, without unpacking it
+
+        Args:
+            direction (Directions): the direction of the movement
+
+        Returns:
+            tuple[int, int]: the packed board after the movement and the score of the merges
+        """
+        positive, vertical = MOVES[direction]
+        return moveBoard(self.board, positive=positive, vertical=vertical)
+
+    def _move(self, *, positive: bool, vertical: bool) -> bool:
+        """
+        Perform the movement updating the board
+
+        Args:
+            positive (bool): if the direction is on the positive axis (right or down)
+            vertical (bool): if the direction is vertical (up or down)
+
+        Returns:
+            bool: if there has been any movement
+
+        With record_slides set, slides gets the same moves of the tiles as Grid gives
+        """
+        board, score = moveBoard(self.board, positive=positive, vertical=vertical)
+        if self.record_slides:
+            self._recordSlides(positive=positive, vertical=vertical)
+        if board == self.board:
+            return False
+        self.board = board
+        self.score += score
+        self.updateAvailableSpace()
+        if self.won:
+            self.finished = True
+        return True
+
+    def _recordSlides(self, *, positive: bool, vertical: bool) -> None:
+        """Follow every tile of the lines that change, like Grid._recordSlides"""
+        self.slides = []
+        rows: list[list[int]] = unpack(self.board)
+        for i in range(4):
+            line: tuple[int, ...] = tuple(row[i] for row in rows) if vertical else tuple(rows[i])
+            if positive:
+                line = line[::-1]
+            if slideLine(line)[0] == line:
+                continue
+            for k, target in enumerate(slideTargets(line)):
+                if target < 0:
+                    continue
+                source: int = 3 - k if positive else k
+                destination: int = 3 - target if positive else target
+                if vertical:
+                    self.slides.append((i, source, i, destination, line[k]))
+                else:
+                    self.slides.append((source, i, destination, i, line[k]))
+
+    @property
+    def maxTile(self) -> int:
+        """The biggest tile of the board"""
+        return toValue(max((self.board >> (4 * i)) & CELL_MASK for i in range(16)))
+
+    @property
+    def won(self) -> bool:
+        """If the win tile has been reached"""
+        return reaches(self.board, toExponent(self.win))
+
+    @property
+    def stuck(self) -> bool:
+        """If the board is full and no pair of neighbours can merge"""
+        return not canMove(self.board)
+
+    @property
+    def hasMoves(self) -> bool:
+        """If there is any movement that changes the board"""
+        return canMove(self.board)
+
+    def inside(self, x: int, y: int) -> bool:
+        """Is the cell from the coordinates inside the boundaries?"""
+        return 0 <= x < self.size and 0 <= y < self.size
+
+    def up(self) -> bool:
+        """Handle when player press up"""
+        return self._move(positive=False, vertical=True)
+
+    def down(self) -> bool:
+        """Handle when player press down"""
+        return self._move(positive=True, vertical=True)
+
+    def right(self) -> bool:
+        """Handle when player press right"""
+        return self._move(positive=True, vertical=False)
+
+    def left(self) -> bool:
+        """Handle when player press left"""
+        return self._move(positive=False, vertical=False)
+
+    def packed(self) -> int:
+        """The board, which is already packed like History.packGrid packs a 4x4 grid"""
+        return self.board
+
+    def loadPacked(self, board: int) -> None:
+        """Put back a board packed by packed(), in O(1)"""
+        self.board = board
+        self.finished = self.won
+        self.updateAvailableSpace()
+
+    def updateAvailableSpace(self) -> None:
+        """Updates the flag keeping track that there is room to move"""
+        self._empty_cells = emptyMask(self.board).bit_count()
+        self.available_space = self._empty_cells > 0
+
+    def resize(self, size: int) -> None:
+        """
+        Reset the board, the size can only be 4
+
+        Raises:
+            ValueError: for any other size
+        """
+        if size != 4:
+            raise ValueError("A BitboardGrid is always 4x4")
+        self.reset()
+
+    def reset(self) -> None:
+        """Reset board"""
+        self.board = 0
+        self.score = 0
+        self._empty_cells = self.size * self.size
+        self._all_dirty = True
+        self.available_space = True
+        self.finished = False
@@ -0,0 +1,148 @@
+"""Module with an expectimax solver that looks for the best movement of a position"""
+
+from array import array
+import time
+from src.Bitboard import MOVES, BitboardGrid, moveBoard, pack, transpose
+from src.Grid import Grid
+from src.MoveTables import CELL_MASK, ROW_MASK, ROWS
+from src.Utils import Directions
+
+SPAWNS: tuple[tuple[int, float], ...] = ((1, 0.8), (2, 0.2))
+
+_heuristic: array | None = None
+
+
+def _rowHeuristic(row: int) -> float:
+    """
+    Value a packed row: empty cells and possible merges are rewarded, rows that are not monotonic
+    and big tiles away from the sides are penalised
+    """
+    cells: list[int] = [(row >> (4 * i)) & CELL_MASK for i in range(4)]
+    empty: int = cells.count(0)
+    merges: int = 0
+    previous: int = 0
+    counter: int = 0
+    for rank in cells:
+        if rank == 0:
+            continue
+        if previous == rank:
+            counter += 1
+        elif counter > 0:
+            merges += 1 + counter
+            counter = 0
+        previous = rank
+    if counter > 0:
+        merges += 1 + counter
+    left: float = 0
+    right: float = 0
+    for i in range(3):
+        if cells[i] > cells[i + 1]:
+            left += cells[i] ** 4 - cells[i + 1] ** 4
+        else:
+            right += cells[i + 1] ** 4 - cells[i] ** 4
+    total: float = sum(rank**3.5 for rank in cells)
+    return 200000 + 270 * empty + 700 * merges - 47 * min(left, right) - 11 * total
+
+
+def _getHeuristic() -> array:
+    global _heuristic  # pylint: disable=W0603
+    if _heuristic is None:
+        _heuristic = array("d", (_rowHeuristic(row) for row in range(ROWS)))
+    return _heuristic
+
+
+class ExpectimaxSolver:
+    """
+    Expectimax search over packed boards
+
+    The max nodes try every movement, the chance nodes put a 2 (80%) or a 4 (20%) in every empty
+    cell like GameState.newTile. A chance node is evaluated with the heuristic when the depth is
+    exhausted or when the probability of reaching it is lower than min_probability.
+    """
+
+    def __init__(self, depth: int = 2, min_probability: float = 1e-4) -> None:
+        self.depth: int = depth
+        self.min_probability: float = min_probability
+        self.nodes: int = 0
+        self.elapsed: float = 0
+        self._table: dict[int, tuple[int, float]] = {}
+        self._heuristic: array = _getHeuristic()
+
+    @property
+    def nodesPerSecond(self) -> float:
+        """Number of nodes visited per second in all the searches done"""
+        return self.nodes / self.elapsed if self.elapsed > 0 else 0
+
+    def resetStats(self) -> None:
+        """Reset the counters of visited nodes and search time"""
+        self.nodes = 0
+        self.elapsed = 0
+
+    def bestMove(self, grid: Grid | BitboardGrid) -> Directions | None:
+        """
+        Search the best movement for a position
+
+        Args:
+            grid (Grid | BitboardGrid): the position, it is not modified
+
+        Returns:
+            Directions | None: the best movement or None if the grid can not move
+        """
+        if grid.size != 4:
+            raise ValueError(f"The solver only works with 4x4 grids, not {grid.size}x{grid.size}")
+        board: int = grid.board if isinstance(grid, BitboardGrid) else pack(grid.grid)
+        start: float = time.perf_counter()
+        self._table.clear()
+        best: Directions | None = None
+        best_value: float = -1
+        for direction, (positive, vertical) in MOVES.items():
+            self.nodes += 1
+            result, _ = moveBoard(board, positive=positive, vertical=vertical)
+            if result == board:
+                continue
+            value: float = self._chanceNode(result, self.depth, 1)
+            if value > best_value:
+                best, best_value = direction, value
+        self.elapsed += time.perf_counter() - start
+        return best
+
+    def _evaluate(self, board: int) -> float:
+        heuristic: array = self._heuristic
+        columns: int = transpose(board)
+        return (
+            heuristic[board & ROW_MASK]
+            + heuristic[(board >> 16) & ROW_MASK]
+            + heuristic[(board >> 32) & ROW_MASK]
+            + heuristic[board >> 48]
+            + heuristic[columns & ROW_MASK]
+            + heuristic[(columns >> 16) & ROW_MASK]
+            + heuristic[(columns >> 32) & ROW_MASK]
+            + heuristic[columns >> 48]
+        )
+
+    def _maxNode(self, board: int, depth: int, probability: float) -> float:
+        self.nodes += 1
+        best: float = 0
+        for positive, vertical in MOVES.values():
+            result, _ = moveBoard(board, positive=positive, vertical=vertical)
+            if result != board:
+                best = max(best, self._chanceNode(result, depth, probability))
+        return best
+
+    def _chanceNode(self, board: int, depth: int, probability: float) -> float:
+        self.nodes += 1
+        if depth == 0 or probability < self.min_probability:
+            return self._evaluate(board)
+        if (entry := self._table.get(board)) is not None and entry[0] >= depth:
+            return entry[1]
+
+        empty: list[int] = [shift for shift in range(0, 64, 4) if (board >> shift) & CELL_MASK == 0]
+        total: float = 0
+        for shift in empty:
+            for exponent, chance in SPAWNS:
+                total += chance * self._maxNode(
+                    board | (exponent << shift), depth - 1, probability * chance / len(empty)
+                )
+        value: float = total / len(empty)
+        self._table[board] = (depth, value)
+        return value
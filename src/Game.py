@@ -1,37 +1,85 @@
 """The game itself"""
 
+import sys
 import tkinter as tk
 from types import TracebackType
-from src import Grid
-from src.Screens import GameScreen, MainMenuScreen, MyScreen, SettingsScreen
+from src.Profiler import StartupProfiler
+from src.ReplayLog import GameRecord, ReplayWriter
+from src.Screens import AnimatedGameScreen, GameScreen, MainMenuScreen, MyScreen, ReplayScreen, SettingsScreen
+from src.Snapshot import Autosave, Snapshot
 from src.Utils import Screens
 
 
 class Game(tk.Tk):
     """Game class where all the magic happens"""
 
-    def __init__(self) -> None:
+    SCREENS: dict[Screens, type[MyScreen]] = {
+        Screens.GAME: GameScreen,
+        Screens.MAIN_MENU: MainMenuScreen,
+        Screens.SETTINGS: SettingsScreen,
+        Screens.REPLAY: ReplayScreen,
+    }
+
+    def __init__(
+        self,
+        profiler: StartupProfiler | None = None,
+        fps: int = 60,
+        animate: bool = False,
+        recorder: ReplayWriter | None = None,
+        replays: list[GameRecord] | None = None,
+        autosave: Autosave | None = None,
+        resume: Snapshot | None = None,
+    ) -> None:
         tk.Tk.__init__(self)
-        self.grid: Grid.Grid = Grid.Grid()
+        self._profiler: StartupProfiler | None = profiler
+        self._mark("tk init")
+        self.fps: int = fps
+        self.recorder: ReplayWriter | None = recorder
+        self.replays: list[GameRecord] = replays if replays is not None else []
+        self.autosave: Autosave | None = autosave
+        self.resume: Snapshot | None = resume
+        self._screens: dict[Screens, type[MyScreen]] = dict(self.SCREENS)
+        if animate:
+            self._screens[Screens.GAME] = AnimatedGameScreen
+        self.win: int = 2048
+        self.base_color: int = 165
+        self.start_color: float = 100
+        self.end_color: float = 66.4
+        self.board_size: int = 4
+        if resume is not None:
+            self.win, self.board_size = resume.win, resume.size
+            self.base_color, self.start_color, self.end_color = resume.base_color, resume.start_color, resume.end_color
         self.title("2048")
         self.mainframe: tk.Frame = tk.Frame(self)
         self.mainframe.grid(column=0, row=0, sticky=tk.N + tk.W + tk.E + tk.S)
         self._current_frame: tk.Frame
         self._frames: dict[Screens, MyScreen] = {}
-        for i, f in enumerate((GameScreen, MainMenuScreen, SettingsScreen)):
-            frame = f(parent=self.mainframe, controller=self)
-            self._frames[Screens(i)] = frame
-
-            frame.grid(row=0, column=0, sticky="nsew")
 
         self.showScreen(Screens.MAIN_MENU)
         self.is_root_alive: bool = True
 
         self.resizable(width=False, height=False)
+        if self._profiler is not None:
+            self.update()
+            self._mark("first draw")
+            self._profiler.report(sys.stderr)
+
+    def _mark(self, phase: str) -> None:
+        if self._profiler is not None:
+            self._profiler.mark(phase)
+
+    def _getFrame(self, screen: Screens) -> MyScreen:
+        """Get a screen, it is only built the first time it is needed"""
+        if screen not in self._frames:
+            frame = self._screens[screen](parent=self.mainframe, controller=self)
+            frame.grid(row=0, column=0, sticky="nsew")
+            self._frames[screen] = frame
+            self._mark(f"build {screen.name.lower()}")
+        return self._frames[screen]
 
     def showScreen(self, screen: Screens) -> None:
         """Show a screen"""
-        self._current_frame = self._frames[screen]
+        self._current_frame = self._getFrame(screen)
         if isinstance(self._current_frame, SettingsScreen):
             self._current_frame.setSettings()
         self._current_frame.bindKeyboard()
@@ -52,31 +100,46 @@ class Game(tk.Tk):
         self.quit()
 
     def reset(self) -> None:
-        """Reset the game"""
-        frame = self._frames[Screens.GAME]
+        """Reset the game, a game screen that has not been built yet starts a new game instead of resuming"""
+        self.resume = None
+        frame = self._frames.get(Screens.GAME)
+        if frame is not None:
+            assert isinstance(frame, GameScreen)
+            frame.reset()
+            self.saveGame()
+
+    def saveGame(self) -> None:
+        """Hand a snapshot of the game to the autosave, the file is written in the background"""
+        frame = self._frames.get(Screens.GAME)
+        if self.autosave is None or frame is None:
+            return
         assert isinstance(frame, GameScreen)
-        frame.reset()
+        self.autosave.save(Snapshot.capture(frame.state, self.base_color, self.start_color, self.end_color).pack())
 
-    def getSettingsParameters(self) -> tuple[int, int, float, float]:
+    def getSettingsParameters(self) -> tuple[int, int, float, float, int]:
         """
         Get the settings parameters
 
         Returns:
-            tuple[int, int, float, float]: win, base_color, start_tone, end_tone
+            tuple[int, int, float, float, int]: win, base_color, start_tone, end_tone, size
         """
-        return (
-            self._frames[Screens.GAME].win,
-            self._frames[Screens.GAME].base_color,
-            self._frames[Screens.GAME].start_color,
-            self._frames[Screens.GAME].end_color,
-        )
-
-    def setGameSettings(self, /, win: int, base: int, start: float, end: float) -> None:
+        return (self.win, self.base_color, self.start_color, self.end_color, self.board_size)
+
+    def setGameSettings(self, /, win: int, base: int, start: float, end: float, size: int = 4) -> None:
         """To be used when the settings have been done"""
-        self._frames[Screens.GAME].win = win
-        self._frames[Screens.GAME].base_color = base
-        self._frames[Screens.GAME].start_color = start
-        self._frames[Screens.GAME].end_color = end
-        game = self._frames[Screens.GAME]
+        self.win = win
+        self.base_color = base
+        self.start_color = start
+        self.end_color = end
+        self.board_size = size
+        game = self._frames.get(Screens.GAME)
+        if game is None:
+            return
         assert isinstance(game, GameScreen)
+        game.win = win
+        game.base_color = base
+        game.start_color = start
+        game.end_color = end
         game.generateColors()
+        game.size = size
+        self.saveGame()
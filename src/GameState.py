@@ -0,0 +1,199 @@
+"""Module with the rules of the game, independent from the interface"""
+
+from collections.abc import Callable, Iterable
+from itertools import repeat
+from random import Random
+from src.Grid import Grid
+from src.SpawnStream import SpawnStream
+from src.Utils import Directions
+
+SEED_MASK: int = (1 << 64) - 1
+TYPE_CHECKING: bool = False
+if TYPE_CHECKING:
+    from src.Bitboard import BitboardGrid
+    from src.ReplayLog import ReplayWriter
+
+
+class GameState:
+    """
+    The grid together with the rules: new tiles, win threshold and game over
+
+    Every game has a seed. The new tiles come from a SpawnStream of that seed and rng, the generator
+    left for the choices of a player, starts from it too, so a game is replayed by its seed and its
+    movements. With a recorder every game, movement and new tile is written to a replay log.
+
+    With bitboard set the game is played on a BitboardGrid, which only has the 4x4 size. It picks the
+    same cells for the new tiles, so a seed gives the same game on both grids.
+    """
+
+    def __init__(
+        self,
+        win: int = 2048,
+        seed: int | None = None,
+        size: int = 4,
+        recorder: "ReplayWriter | None" = None,
+        bitboard: bool = False,
+    ) -> None:
+        self.grid: "Grid | BitboardGrid"
+        if bitboard:
+            from src.Bitboard import BitboardGrid  # pylint: disable=C0415,W0621
+
+            if size != 4:
+                raise ValueError("A BitboardGrid is always 4x4")
+            self.grid = BitboardGrid(win)
+        else:
+            self.grid = Grid(size, win)
+        self.recorder: "ReplayWriter | None" = recorder
+        self.seed: int
+        self.spawns: SpawnStream
+        self.rng: Random
+        self._moves: dict[Directions, Callable[[], bool]] = {
+            direction: function
+            for direction, function in zip(
+                Directions, [self.grid.up, self.grid.left, self.grid.down, self.grid.right]
+            )
+        }
+
+        self.reset(seed)
+
+    @property
+    def win(self) -> int:
+        """The tile needed to win the game"""
+        return self.grid.win
+
+    @win.setter
+    def win(self, win: int) -> None:
+        self.grid.win = win
+
+    @property
+    def size(self) -> int:
+        """Number of cells per side of the grid"""
+        return self.grid.size
+
+    def resize(self, size: int) -> None:
+        """Change the number of cells per side, which starts a new game"""
+        self.grid.resize(size)
+        self.reset()
+
+    @property
+    def score(self) -> int:
+        """The score of the current game"""
+        return self.grid.score
+
+    def move(self, direction: Directions) -> bool:
+        """
+        Move the grid without adding a new tile
+
+        Args:
+            direction (Directions): the direction of the movement
+
+        Returns:
+            bool: if there has been any movement
+        """
+        moved: bool = self._moves[direction]()
+        if moved and self.recorder is not None:
+            self.recorder.move(direction)
+        return moved
+
+    def step(self, direction: Directions) -> bool:
+        """
+        Move the grid and add a new tile if there has been any movement
+
+        Args:
+            direction (Directions): the direction of the movement
+
+        Returns:
+            bool: if there has been any movement
+        """
+        moved: bool = self.move(direction)
+        if moved:
+            self.newTile()
+        return moved
+
+    def isEndgame(self) -> bool:
+        """
+        Checks if the player has won or can not move anymore
+        """
+        return self.grid.won or self.grid.stuck
+
+    def newTile(self) -> None:
+        """
+        Generate a new tile if there is space
+        """
+        if not self.grid.emptyCount:
+            return
+
+        where, chance = self.spawns.next()
+        cell: tuple[int, int] | None = self.grid.emptyCell(where)
+        if cell is None:
+            return
+        x, y = cell
+        self.grid.setTile(x, y, 2 if chance < 0.8 else 4)
+        if self.recorder is not None:
+            self.recorder.spawn(y * self.size + x, chance >= 0.8)
+
+    def setGrid(self, grid: list[list[int]], score: int = 0) -> None:
+        """Start playing from a copy of the given tiles"""
+        self.grid.grid = grid
+        self.grid.score = score
+        self.grid.finished = False
+        self.grid.updateAvailableSpace()
+
+    def checkpoint(self) -> tuple[int, int, int]:
+        """The packed board, the score and the position of the new tiles stream, to be kept in a History"""
+        return (self.grid.packed(), self.grid.score, self.spawns.position)
+
+    def restore(self, board: int, score: int, position: int) -> None:
+        """
+        Go back to a checkpoint of the current game
+
+        On a BitboardGrid it is O(1). On a Grid the n cells are compared and only the changed ones are
+        written, the indexes are not rebuilt.
+        """
+        self.grid.loadPacked(board)
+        self.grid.score = score
+        self.spawns.seek(position)
+
+    def reseed(self, seed: int) -> None:
+        """
+        Restart the new tiles and the player generator from a seed, the grid is kept
+
+        The seed is reduced to 64 bits, the size it has in the replay logs and the snapshots.
+        """
+        self.seed = seed & SEED_MASK
+        self.spawns = SpawnStream(self.seed)
+        self.rng = Random(self.seed)
+
+    def reset(self, seed: int | None = None) -> None:
+        """
+        Reset the game
+
+        Args:
+            seed (int | None): seed of the new game, a random one if None
+        """
+        self.reseed(seed if seed is not None else Random().getrandbits(64))
+        self.grid.reset()
+        if self.recorder is not None:
+            self.recorder.startGame(self.seed, self.win, self.size)
+        for _ in repeat(None, 2):
+            self.newTile()
+        self.grid.updateAvailableSpace()
+
+
+def replay(seed: int, directions: Iterable[Directions], win: int = 2048, size: int = 4) -> GameState:
+    """
+    Play a game again from its seed and its movements
+
+    Args:
+        seed (int): the seed of the game
+        directions (Iterable[Directions]): the movements in the order they were played
+        win (int): the tile needed to win the game
+        size (int): number of cells per side of the grid
+
+    Returns:
+        GameState: the game after the last movement
+    """
+    state: GameState = GameState(win, seed, size)
+    for direction in directions:
+        state.step(direction)
+    return state
@@ -1,24 +1,288 @@
 """Module to have the grid and do all the operations"""
 
+from collections.abc import Iterator, Sequence
+from functools import lru_cache
+from random import Random
+from src.Utils import Directions
+
+MIN_SIZE: int = 3
+MAX_SIZE: int = 16
+
+
+@lru_cache(maxsize=1 << 16)
+def slideLine(line: tuple[int, ...]) -> tuple[tuple[int, ...], int]:
+    """
+    Slide and merge a line of tiles towards its first cell
+
+    Args:
+        line (tuple[int, ...]): the tile values, the movement goes towards the index 0
+
+    Returns:
+        tuple[tuple[int, ...], int]: the line after the movement and the score of the merges
+    """
+    tiles: list[int] = [value for value in line if value != 0]
+    result: list[int] = []
+    score: int = 0
+    i: int = 0
+    while i < len(tiles):
+        if i + 1 < len(tiles) and tiles[i] == tiles[i + 1]:
+            result.append(tiles[i] * 2)
+            score += tiles[i] * 2
+            i += 2
+        else:
+            result.append(tiles[i])
+            i += 1
+    result.extend(0 for _ in range(len(line) - len(result)))
+    return tuple(result), score
+
+
+@lru_cache(maxsize=1 << 16)
+def slideTargets(line: tuple[int, ...]) -> tuple[int, ...]:
+    """
+    Follow the tiles of a line through slideLine
+
+    Args:
+        line (tuple[int, ...]): the tile values, the movement goes towards the index 0
+
+    Returns:
+        tuple[int, ...]: the index where each tile ends, -1 for the empty cells
+    """
+    targets: list[int] = [-1] * len(line)
+    sources: list[int] = [k for k, value in enumerate(line) if value != 0]
+    i: int = 0
+    target: int = 0
+    while i < len(sources):
+        targets[sources[i]] = target
+        if i + 1 < len(sources) and line[sources[i]] == line[sources[i + 1]]:
+            targets[sources[i + 1]] = target
+            i += 2
+        else:
+            i += 1
+        target += 1
+    return tuple(targets)
+
+
+class GridRow(Sequence[int]):
+    """A row of a Grid, writing a cell goes through setTile so the indexes of the grid stay up to date"""
+
+    def __init__(self, grid: "Grid", y: int) -> None:
+        self._grid: Grid = grid
+        self._y: int = y
+
+    def __len__(self) -> int:
+        return self._grid.size
+
+    def __getitem__(self, key: int | slice) -> int | list[int]:
+        return self._grid._grid[self._y][key]  # pylint: disable=W0212
+
+    def __setitem__(self, key: int, value: int) -> None:
+        self._grid.setTile(range(self._grid.size)[key], self._y, value)
+
+    def __iter__(self) -> Iterator[int]:
+        return iter(self._grid._grid[self._y])  # pylint: disable=W0212
+
+    def __eq__(self, other: object) -> bool:
+        if isinstance(other, Sequence):
+            return list(self) == list(other)
+        return NotImplemented
+
+    def __repr__(self) -> str:
+        return repr(list(self))
+
+    def __deepcopy__(self, memo: dict[int, object]) -> list[int]:
+        return list(self)
+
 
 class Grid:
     """Grid class"""
 
-    def __init__(self) -> None:
-        self.size: int = 4
-        self.grid: list[list[int]]
-        self._empty_cells: int
+    def __init__(self, size: int = 4, win: int = 2048) -> None:
+        self.size: int = size
+        self.win: int = win
+        self._grid: list[list[int]]
+        self.score: int
+        self._empty_count: int
+        self._empty_tree: list[int]
+        self._empty_step: int
+        self._max_tile: int
+        self._pairs: int
+        self._dirty: set[int] = set()
+        self._all_dirty: bool = True
+        self.track_dirty: bool = False
+        self.record_slides: bool = False
+        self.slides: list[tuple[int, int, int, int, int]] = []
         self.available_space: bool
         self.finished: bool
 
         self.reset()
 
-    def __getitem__(self, key: int) -> list[int]:
-        return self.grid[key]
+    def __getitem__(self, key: int) -> GridRow:
+        return GridRow(self, range(self.size)[key])
+
+    @property
+    def grid(self) -> list[GridRow]:
+        """The rows of the grid, writing a cell of a row writes the grid"""
+        return [GridRow(self, y) for y in range(self.size)]
+
+    @grid.setter
+    def grid(self, grid: Sequence[Sequence[int]]) -> None:
+        self.size = len(grid)
+        self._grid = [list(row) for row in grid]
+        self._indexTiles()
+
+    def _indexTiles(self) -> None:
+        """Rebuild the Fenwick tree of empty cells, the max tile and the mergeable pairs from the tiles"""
+        self._all_dirty = True
+        cells: int = self.size * self.size
+        self._empty_tree = [0] + [1 if value == 0 else 0 for row in self._grid for value in row]
+        self._empty_count = sum(self._empty_tree)
+        for i in range(1, cells + 1):
+            parent: int = i + (i & -i)
+            if parent <= cells:
+                self._empty_tree[parent] += self._empty_tree[i]
+        self._empty_step = 1 << (cells.bit_length() - 1)
+        self._max_tile = max(max(row) for row in self._grid)
+        self._pairs = sum(
+            self._equalNeighbours(x, y, value) for y, row in enumerate(self._grid) for x, value in enumerate(row)
+        ) // 2
+
+    def _equalNeighbours(self, x: int, y: int, value: int) -> int:
+        """Number of neighbours of the cell with the given tile, 0 for an empty cell"""
+        if value == 0:
+            return 0
+        count: int = 0
+        if x > 0 and self._grid[y][x - 1] == value:
+            count += 1
+        if x < self.size - 1 and self._grid[y][x + 1] == value:
+            count += 1
+        if y > 0 and self._grid[y - 1][x] == value:
+            count += 1
+        if y < self.size - 1 and self._grid[y + 1][x] == value:
+            count += 1
+        return count
+
+    def _setCell(self, x: int, y: int, value: int) -> None:
+        """
+        Write a cell keeping the empty cells, the max tile, the mergeable pairs and, with track_dirty set,
+        the changed cells up to date
+        """
+        previous: int = self._grid[y][x]
+        self._pairs += self._equalNeighbours(x, y, value) - self._equalNeighbours(x, y, previous)
+        if value > self._max_tile:
+            self._max_tile = value
+        cell: int = y * self.size + x
+        if self.track_dirty:
+            self._dirty.add(cell)
+        if previous == 0 and value != 0:
+            self._countEmpty(cell, -1)
+        elif previous != 0 and value == 0:
+            self._countEmpty(cell, 1)
+        self._grid[y][x] = value
+
+    def _countEmpty(self, cell: int, change: int) -> None:
+        """Add a change to the count of a cell in the Fenwick tree of empty cells"""
+        self._empty_count += change
+        tree: list[int] = self._empty_tree
+        i: int = cell + 1
+        while i < len(tree):
+            tree[i] += change
+            i += i & -i
+
+    def setTile(self, x: int, y: int, value: int) -> None:
+        """Set the value of a single cell"""
+        previous: int = self._grid[y][x]
+        self._setCell(x, y, value)
+        if previous == self._max_tile > value:
+            self._max_tile = max(max(row) for row in self._grid)
+        self.finished = self._max_tile >= self.win
+
+    @property
+    def maxTile(self) -> int:
+        """The biggest tile of the grid"""
+        return self._max_tile
+
+    @property
+    def won(self) -> bool:
+        """If the win tile has been reached"""
+        return self._max_tile >= self.win
+
+    @property
+    def stuck(self) -> bool:
+        """If the grid is full and no pair of neighbours can merge"""
+        return self._empty_count == 0 and self._pairs == 0
+
+    @property
+    def hasMoves(self) -> bool:
+        """If there is any movement that changes the grid"""
+        return self._empty_count > 0 or self._pairs > 0
+
+    def takeDirty(self) -> list[tuple[int, int]]:
+        """
+        Get the cells written since the last call, every cell after the whole grid has been replaced or
+        when track_dirty is not set
+
+        Returns:
+            list[tuple[int, int]]: the coordinates (x, y) of the cells
+        """
+        every: bool = self._all_dirty or not self.track_dirty
+        cells: range | set[int] = range(self.size * self.size) if every else self._dirty
+        dirty: list[tuple[int, int]] = [(cell % self.size, cell // self.size) for cell in cells]
+        self._dirty = set()
+        self._all_dirty = False
+        return dirty
+
+    def emptyCells(self) -> list[tuple[int, int]]:
+        """Coordinates (x, y) of the empty cells, in reading order"""
+        return [(x, y) for y, row in enumerate(self._grid) for x, value in enumerate(row) if value == 0]
+
+    @property
+    def emptyCount(self) -> int:
+        """Number of empty cells"""
+        return self._empty_count
+
+    def emptyCell(self, fraction: float) -> tuple[int, int] | None:
+        """
+        Pick an empty cell from a number, the same tiles always give the same cell whatever the history of
+        the grid
+
+        The k-th empty cell in reading order is found in O(log n) by descending a Fenwick tree of the
+        empty cells.
+
+        Args:
+            fraction (float): a number in [0, 1) that selects the cell among the empty ones in reading order
+
+        Returns:
+            tuple[int, int] | None: the coordinates (x, y) of the cell or None if the grid is full
+        """
+        if not self._empty_count:
+            return None
+        k: int = int(fraction * self._empty_count)
+        tree: list[int] = self._empty_tree
+        cell: int = 0
+        step: int = self._empty_step
+        while step:
+            i: int = cell + step
+            if i < len(tree) and tree[i] <= k:
+                cell = i
+                k -= tree[i]
+            step >>= 1
+        return (cell % self.size, cell // self.size)
+
+    def randomEmptyCell(self, rng: Random) -> tuple[int, int] | None:
+        """
+        Pick an empty cell at random, without scanning the grid
+
+        Args:
+            rng (Random): the random generator used to choose
+
+        Returns:
+            tuple[int, int] | None: the coordinates (x, y) of the cell or None if the grid is full
+        """
+        return self.emptyCell(rng.random())
 
     def _move(self, *, positive: bool, vertical: bool) -> bool:
         """
-        Perform the movement updating the grid
+        Perform the movement updating the grid, line by line
 
         Args:
             positive (bool): if the direction is on the positive axis (right or down)
@@ -26,56 +290,106 @@ class Grid:
 
         Returns:
             bool: if there has been any moevement
-        """
-        start: int
-        finish: int
-        step: int
-        if positive:
-            start = self.size - 1
-            finish = -1
-            step = -1
-        else:
-            start = 0
-            finish = self.size
-            step = 1
 
+        With record_slides set, slides gets the (x, y) origin, the (x, y) destination and the value of
+        every tile of the lines that changed
+        """
+        last: int = self.size - 1
         moved: bool = False
-        for i in range(start, finish, step):
-            limit_x: int = self.size if positive else -1
-            limit_y: int = self.size if positive else -1
-            for j in range(start + step, finish, step):
-                (x, y) = (i, j) if vertical else (j, i)
-                if (number := self.grid[y][x]) != 0:
-                    scan: int = y if vertical else x
-                    (scan_start, scan_end, scan_step) = (scan + 1, self.size, 1) if positive else (scan - 1, -1, -1)
-                    (x2, y2) = (x, scan) if vertical else (scan, y)
-                    stp: int = 1 if positive else -1
-                    (x3, y3) = (x, scan + stp) if vertical else (scan + stp, y)
-                    merged: bool = self._merge(x2, y2, x3, y3, limit_x, limit_y)
-                    if merged:
-                        limit_x = x2
-                        limit_y = y2
-                    moved = merged or moved
-                    for scan in range(scan_start, scan_end, scan_step):
-                        (x2, y2) = (x, scan) if vertical else (scan, y)
-                        (x3, y3) = (x, scan + stp) if vertical else (scan + stp, y)
-                        if self.grid[y2][x2] == 0 and (
-                            self._inLimit(y2 if vertical else x2, positive) or (self.grid[y3][x3] != 0)
-                        ):
-                            self.grid[y][x] = 0
-                            self.grid[y2][x2] = number
-                            moved = True
-                            break
-                    moved = self._merge(x2, y2, x3, y3, limit_x, limit_y) or moved
+        if self.record_slides:
+            self.slides = []
+        for i in range(self.size):
+            line: tuple[int, ...] = tuple(row[i] for row in self._grid) if vertical else tuple(self._grid[i])
+            if positive:
+                line = line[::-1]
+            result, score = slideLine(line)
+            if result == line:
+                continue
+            moved = True
+            self.score += score
+            if self.record_slides:
+                self._recordSlides(line, i, positive=positive, vertical=vertical)
+            for k, value in enumerate(result):
+                if value != line[k]:
+                    j: int = last - k if positive else k
+                    if vertical:
+                        self._setCell(i, j, value)
+                    else:
+                        self._setCell(j, i, value)
+        if moved:
+            self.available_space = self._empty_count > 0
+            if self._max_tile >= self.win:
+                self.finished = True
         return moved
 
+    def _recordSlides(self, line: tuple[int, ...], i: int, *, positive: bool, vertical: bool) -> None:
+        """Add the movement of every tile of a line, as seen from the line start, to the slides"""
+        last: int = self.size - 1
+        for k, target in enumerate(slideTargets(line)):
+            if target < 0:
+                continue
+            source: int = last - k if positive else k
+            destination: int = last - target if positive else target
+            if vertical:
+                self.slides.append((i, source, i, destination, line[k]))
+            else:
+                self.slides.append((source, i, destination, i, line[k]))
+
+    def availableMoves(self) -> int:
+        """
+        Find the movements that would change the grid, without moving it
+
+        Returns:
+            int: mask with the bit 1 << direction.value set for every legal Directions
+        """
+        up: int = 1 << Directions.Up.value
+        left: int = 1 << Directions.Left.value
+        down: int = 1 << Directions.Down.value
+        right: int = 1 << Directions.Right.value
+        last: int = self.size - 1
+        mask: int = 0
+        for y, row in enumerate(self._grid):
+            for x, value in enumerate(row):
+                if value == 0:
+                    continue
+                if x > 0 and row[x - 1] in (0, value):
+                    mask |= left
+                if x < last and row[x + 1] in (0, value):
+                    mask |= right
+                if y > 0 and self._grid[y - 1][x] in (0, value):
+                    mask |= up
+                if y < last and self._grid[y + 1][x] in (0, value):
+                    mask |= down
+            if mask == up | left | down | right:
+                break
+        return mask
+
+    def peek(self, direction: Directions) -> tuple[list[list[int]], int]:
+        """
+        Compute a movement without changing the grid
+
+        Args:
+            direction (Directions): the direction of the movement
+
+        Returns:
+            tuple[list[list[int]], int]: the rows after the movement and the score of the merges
+        """
+        vertical: bool = direction in (Directions.Up, Directions.Down)
+        positive: bool = direction in (Directions.Down, Directions.Right)
+        lines: list[tuple[int, ...]] = list(zip(*self._grid)) if vertical else [tuple(row) for row in self._grid]
+        result: list[tuple[int, ...]] = []
+        score: int = 0
+        for line in lines:
+            moved, points = slideLine(line[::-1] if positive else line)
+            result.append(moved[::-1] if positive else moved)
+            score += points
+        rows: list[list[int]] = [list(row) for row in zip(*result)] if vertical else [list(row) for row in result]
+        return rows, score
+
     def inside(self, x: int, y: int) -> bool:
         """Is the cell from the coordinates inside the boundaries?"""
         return 0 <= x < self.size and 0 <= y < self.size
 
-    def _inLimit(self, var: int, positive: bool) -> bool:
-        return var == self.size - 1 if positive else var == 0
-
     def up(self) -> bool:
         """Handle when player press up"""
         return self._move(positive=False, vertical=True)
@@ -92,33 +406,46 @@ class Grid:
         """Handle when player press left"""
         return self._move(positive=False, vertical=False)
 
+    def packed(self) -> int:
+        """The tiles packed into an int by History.packGrid"""
+        from src.History import packGrid  # pylint: disable=C0415
+
+        return packGrid(self._grid)
+
+    def loadPacked(self, board: int) -> None:
+        """
+        Put back tiles packed by packed(), the size does not change
+
+        Only the cells that differ are written, so the indexes are updated for the changed cells after
+        an O(n) comparison instead of being rebuilt.
+        """
+        from src.History import unpackGrid  # pylint: disable=C0415
+
+        lowered: bool = False
+        for y, row in enumerate(unpackGrid(board, self.size)):
+            current: list[int] = self._grid[y]
+            for x, value in enumerate(row):
+                previous: int = current[x]
+                if previous != value:
+                    lowered = lowered or previous == self._max_tile > value
+                    self._setCell(x, y, value)
+        if lowered:
+            self._max_tile = max(max(row) for row in self._grid)
+        self.finished = self._max_tile >= self.win
+        self.updateAvailableSpace()
+
     def updateAvailableSpace(self) -> None:
         """Updates the flag keeping track that there is room to move"""
-        self._empty_cells = sum(row.count(0) for row in self.grid)
-        self.available_space = self._empty_cells > 0
-
-    def _merge(self, x1: int, y1: int, x2: int, y2: int, limit_x: int, limit_y: int) -> bool:
-        if not self.inside(x2, y2):
-            return False
-        if x1 == x2 and limit_y <= y1 < y2 or y2 < y1 <= limit_y:
-            return False
-        if y1 == y2 and limit_x <= x1 < x2 or x2 < x1 <= limit_x:
-            return False
-        current: int = self.grid[y1][x1]
-        other: int = self.grid[y2][x2]
-        if current != other:
-            return False
-        self.grid[y1][x1] = 0
-        self.grid[y2][x2] *= 2
-        self._empty_cells += 1
-        self.available_space = True
-        if current == 2048:
-            self.finished = True
-        return True
+        self.available_space = self._empty_count > 0
+
+    def resize(self, size: int) -> None:
+        """Change the number of cells per side, which resets the grid"""
+        self.size = size
+        self.reset()
 
     def reset(self) -> None:
         """Resset board"""
         self.grid = [[0 for _ in range(self.size)] for _ in range(self.size)]
-        self._empty_cells = self.size * self.size
+        self.score = 0
         self.available_space = True
         self.finished = False
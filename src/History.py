@@ -0,0 +1,110 @@
+"""Module with a bounded history of positions to undo and redo movements"""
+
+
+def packGrid(grid: list[list[int]]) -> int:
+    """
+    Pack the rows of tile values into a single int, with the exponent of each cell in 4 bits
+
+    A 4x4 board is one 64 bit int laid out like a BitboardGrid board. When an exponent does not fit in
+    4 bits every cell takes a byte and a marker bit is set above the cells.
+    """
+    exponents: list[int] = [value.bit_length() - 1 if value else 0 for row in grid for value in row]
+    if max(exponents) > 0xF:
+        return int.from_bytes(bytes(exponents), "little") | 1 << (8 * len(exponents))
+    board: int = 0
+    for cell, exponent in enumerate(exponents):
+        board |= exponent << (4 * cell)
+    return board
+
+
+def unpackGrid(board: int, size: int) -> list[list[int]]:
+    """Unpack a board made by packGrid into rows of tile values"""
+    cells: int = size * size
+    exponents: list[int]
+    if board >> (8 * cells):
+        exponents = list((board & ((1 << (8 * cells)) - 1)).to_bytes(cells, "little"))
+    else:
+        exponents = [(board >> (4 * cell)) & 0xF for cell in range(cells)]
+    values: list[int] = [1 << exponent if exponent else 0 for exponent in exponents]
+    return [values[y * size : (y + 1) * size] for y in range(size)]
+
+
+class History:
+    """
+    A ring buffer of positions: a packed board, a score and the position of the new tiles stream
+
+    The buffer is allocated once with room for capacity positions, when it is full the oldest position
+    is dropped. Every operation is O(1) and nothing is copied, so a search can push a position after a
+    movement and undo it to backtrack. Putting a position back on a grid is GameState.restore.
+    """
+
+    def __init__(self, capacity: int = 1024) -> None:
+        if capacity < 1:
+            raise ValueError("The history needs room for at least one position")
+        self.capacity: int = capacity
+        self._boards: list[int] = [0] * capacity
+        self._scores: list[int] = [0] * capacity
+        self._positions: list[int] = [0] * capacity
+        self._start: int = 0
+        self._count: int = 0
+        self._cursor: int = -1
+
+    def __len__(self) -> int:
+        return self._count
+
+    @property
+    def canUndo(self) -> bool:
+        """If there is a position before the current one"""
+        return self._cursor > 0
+
+    @property
+    def canRedo(self) -> bool:
+        """If a position has been undone and can be played again"""
+        return self._cursor < self._count - 1
+
+    def clear(self) -> None:
+        """Forget every position"""
+        self._start = 0
+        self._count = 0
+        self._cursor = -1
+
+    def push(self, board: int, score: int = 0, position: int = 0) -> None:
+        """Make a new position the current one, the undone positions after it are forgotten"""
+        self._count = self._cursor + 1
+        if self._count == self.capacity:
+            self._start = (self._start + 1) % self.capacity
+            self._count -= 1
+        slot: int = (self._start + self._count) % self.capacity
+        self._boards[slot] = board
+        self._scores[slot] = score
+        self._positions[slot] = position
+        self._cursor = self._count
+        self._count += 1
+
+    def _get(self, index: int) -> tuple[int, int, int]:
+        slot: int = (self._start + index) % self.capacity
+        return (self._boards[slot], self._scores[slot], self._positions[slot])
+
+    def undo(self) -> tuple[int, int, int] | None:
+        """
+        Go back to the previous position
+
+        Returns:
+            tuple[int, int, int] | None: the board, the score and the stream position, None at the oldest one
+        """
+        if not self.canUndo:
+            return None
+        self._cursor -= 1
+        return self._get(self._cursor)
+
+    def redo(self) -> tuple[int, int, int] | None:
+        """
+        Go forward to the position that was undone last
+
+        Returns:
+            tuple[int, int, int] | None: the board, the score and the stream position, None if there is none
+        """
+        if not self.canRedo:
+            return None
+        self._cursor += 1
+        return self._get(self._cursor)
@@ -0,0 +1,119 @@
+"""Module with a player that chooses its movements with random playouts run in parallel"""
+
+from concurrent.futures import Future, ProcessPoolExecutor
+import os
+from random import Random
+from types import TracebackType
+from src.GameState import GameState
+from src.Grid import Grid
+from src.History import History
+from src.Utils import Directions
+
+
+def _rollouts(grid: list[list[int]], direction: int, seeds: list[int], depth: int | None) -> int:
+    """
+    Play random games after a first movement, every playout is undone back to the start with a History
+
+    Args:
+        grid (list[list[int]]): the starting tiles
+        direction (int): the value of the first Directions to play
+        seeds (list[int]): one seed per playout for the random generator of the tiles and the movements
+        depth (int | None): maximum number of random movements of each playout, no limit if None
+
+    Returns:
+        int: the sum of the final scores of all the playouts
+    """
+    state: GameState = GameState()
+    state.setGrid(grid)
+    history: History = History(capacity=2)
+    history.push(*state.checkpoint())
+    total: int = 0
+    for seed in seeds:
+        state.reseed(seed)
+        rng: Random = state.rng
+        directions: list[Directions] = list(Directions)
+        state.step(Directions(direction))
+        moves: int = 0
+        while not state.isEndgame() and (depth is None or moves < depth):
+            rng.shuffle(directions)
+            if not any(state.step(random_direction) for random_direction in directions):
+                break
+            moves += 1
+        total += state.score
+        history.push(*state.checkpoint())
+        start: tuple[int, int, int] | None = history.undo()
+        assert start is not None
+        state.restore(*start)
+    return total
+
+
+class MonteCarloPlayer:
+    """
+    Player that runs random playouts after every possible movement and picks the one with the best
+    average score
+
+    The playouts of each movement are split in one chunk per worker of a process pool. Every playout
+    gets its own seed from the player generator, so the choices only depend on the player seed and
+    not on the number of workers or on the order the chunks finish.
+    """
+
+    def __init__(
+        self, rollouts: int = 100, depth: int | None = None, workers: int | None = None, seed: int | None = None
+    ) -> None:
+        self.rollouts: int = rollouts
+        self.depth: int | None = depth
+        self.workers: int | None = workers
+        self._rng: Random = Random(seed)
+        self._executor: ProcessPoolExecutor | None = None
+
+    def __enter__(self) -> "MonteCarloPlayer":
+        return self
+
+    def __exit__(
+        self, exc_type: type[BaseException] | None, exc_val: BaseException | None, exc_tb: TracebackType | None
+    ) -> None:
+        self.close()
+
+    def close(self) -> None:
+        """Stop the worker processes"""
+        if self._executor is not None:
+            self._executor.shutdown()
+            self._executor = None
+
+    def _chunks(self, seeds: list[int]) -> list[list[int]]:
+        workers: int = self.workers or os.cpu_count() or 1
+        return [chunk for i in range(workers) if (chunk := seeds[i::workers])]
+
+    def _getExecutor(self) -> ProcessPoolExecutor:
+        if self._executor is None:
+            self._executor = ProcessPoolExecutor(max_workers=self.workers)
+        return self._executor
+
+    def bestMove(self, grid: Grid) -> Directions | None:
+        """
+        Search the best movement for a position
+
+        Args:
+            grid (Grid): the position, it is not modified
+
+        Returns:
+            Directions | None: the best movement or None if the grid can not move
+        """
+        tiles: list[list[int]] = [list(row) for row in grid.grid]
+        legal: int = grid.availableMoves()
+        executor: ProcessPoolExecutor = self._getExecutor()
+        futures: dict[Directions, list[Future[int]]] = {}
+        for direction in Directions:
+            if not legal >> direction.value & 1:
+                continue
+            seeds: list[int] = [self._rng.getrandbits(64) for _ in range(self.rollouts)]
+            futures[direction] = [
+                executor.submit(_rollouts, tiles, direction.value, chunk, self.depth) for chunk in self._chunks(seeds)
+            ]
+        best: Directions | None = None
+        best_score: float = -1
+        for direction, results in futures.items():
+            score: float = sum(future.result() for future in results) / self.rollouts
+            if score > best_score:
+                best, best_score = direction, score
+        return best
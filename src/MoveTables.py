@@ -0,0 +1,153 @@
+"""Module with the precomputed movement of every packed row of 4 tiles"""
+
+from array import array
+import os
+from pathlib import Path
+import sys
+
+ROWS: int = 1 << 16
+ROW_MASK: int = 0xFFFF
+CELL_MASK: int = 0xF
+_MAGIC: bytes = b"2048MT1\n"
+CACHE: Path = Path.home() / ".2048" / "tables.bin"
+
+
+def reverseRow(row: int) -> int:
+    """Mirror the 4 cells of a packed row"""
+    return (row >> 12) | ((row >> 4) & 0x00F0) | ((row << 4) & 0x0F00) | ((row << 12) & 0xF000)
+
+
+def slideRowLeft(row: int) -> tuple[int, int]:
+    """
+    Slide and merge a packed row towards the cell 0
+
+    Args:
+        row (int): 4 exponents of 4 bits, the cell 0 is on the lowest bits
+
+    Returns:
+        tuple[int, int]: the packed row after the movement and the score of the merges
+    """
+    tiles: list[int] = [cell for i in range(4) if (cell := (row >> (4 * i)) & CELL_MASK) != 0]
+    result: list[int] = []
+    score: int = 0
+    i: int = 0
+    while i < len(tiles):
+        if i + 1 < len(tiles) and tiles[i] == tiles[i + 1] and tiles[i] < CELL_MASK:
+            result.append(tiles[i] + 1)
+            score += 1 << (tiles[i] + 1)
+            i += 2
+        else:
+            result.append(tiles[i])
+            i += 1
+    packed: int = 0
+    for i, cell in enumerate(result):
+        packed |= cell << (4 * i)
+    return packed, score
+
+
+class MoveTables:
+    """
+    Result of moving every possible row to the left and to the right
+
+    The score of a row is the same whatever the direction, as both merge the same pairs of values.
+    """
+
+    def __init__(self, left: array, right: array, score: array, left_changed: bytes, right_changed: bytes) -> None:
+        self.left: array = left
+        self.right: array = right
+        self.score: array = score
+        self.left_changed: bytes = left_changed
+        self.right_changed: bytes = right_changed
+
+    @classmethod
+    def build(cls) -> "MoveTables":
+        """Compute the tables from scratch"""
+        left: array = array("H", bytes(2 * ROWS))
+        right: array = array("H", bytes(2 * ROWS))
+        score: array = array("I", bytes(4 * ROWS))
+        for row in range(ROWS):
+            result, points = slideRowLeft(row)
+            left[row] = result
+            right[reverseRow(row)] = reverseRow(result)
+            score[row] = points
+        left_changed: bytes = bytes(left[row] != row for row in range(ROWS))
+        right_changed: bytes = bytes(right[row] != row for row in range(ROWS))
+        return cls(left, right, score, left_changed, right_changed)
+
+    @classmethod
+    def load(cls, path: Path) -> "MoveTables":
+        """Load the tables from a file written by save"""
+        with open(path, "rb") as file:
+            if file.read(len(_MAGIC)) != _MAGIC:
+                raise ValueError(f"{path} is not a move tables file")
+            left: array = array("H")
+            right: array = array("H")
+            score: array = array("I")
+            try:
+                left.fromfile(file, ROWS)
+                right.fromfile(file, ROWS)
+                score.fromfile(file, ROWS)
+            except EOFError as error:
+                raise ValueError(f"{path} is truncated") from error
+            left_changed: bytes = file.read(ROWS)
+            right_changed: bytes = file.read(ROWS)
+        if len(right_changed) != ROWS:
+            raise ValueError(f"{path} is truncated")
+        if sys.byteorder == "big":
+            for table in (left, right, score):
+                table.byteswap()
+        return cls(left, right, score, left_changed, right_changed)
+
+    def save(self, path: Path) -> None:
+        """Write the tables into a file, stored as little endian, so that readers never see half a file"""
+        tables: list[array] = [array(table.typecode, table) for table in (self.left, self.right, self.score)]
+        if sys.byteorder == "big":
+            for table in tables:
+                table.byteswap()
+        path.parent.mkdir(parents=True, exist_ok=True)
+        temporary: Path = path.with_name(f"{path.name}.{os.getpid()}.tmp")
+        with open(temporary, "wb") as file:
+            file.write(_MAGIC)
+            for table in tables:
+                table.tofile(file)
+            file.write(self.left_changed)
+            file.write(self.right_changed)
+        os.replace(temporary, path)
+
+
+_tables: MoveTables | None = None
+
+
+def getTables(cache: Path | None = None) -> MoveTables:
+    """
+    Get the process wide tables, they are only computed the first time
+
+    Args:
+        cache (Path | None): file to load the tables from, it is written if it does not exist yet or can
+            not be read
+
+    Returns:
+        MoveTables: the tables
+    """
+    global _tables  # pylint: disable=W0603
+    if _tables is None and cache is not None:
+        try:
+            _tables = MoveTables.load(cache)
+            return _tables
+        except (OSError, ValueError):
+            _tables = MoveTables.build()
+            _writeCache(_tables, cache)
+            return _tables
+    if _tables is None:
+        _tables = MoveTables.build()
+    elif cache is not None and not cache.exists():
+        _writeCache(_tables, cache)
+    return _tables
+
+
+def _writeCache(tables: MoveTables, cache: Path) -> None:
+    """Save the tables, a cache that can not be written is only slower to start next time"""
+    try:
+        tables.save(cache)
+    except OSError:
+        pass
@@ -0,0 +1,31 @@
+"""Module to measure how long each phase of the startup takes"""
+
+import time
+from typing import Callable, TextIO
+
+
+class StartupProfiler:
+    """Split the time since its creation in named phases"""
+
+    def __init__(self, clock: Callable[[], float] = time.perf_counter) -> None:
+        self._clock: Callable[[], float] = clock
+        self._last: float = clock()
+        self.phases: list[tuple[str, float]] = []
+
+    def mark(self, phase: str) -> None:
+        """End a phase, it lasted since the previous mark or since the profiler was created"""
+        now: float = self._clock()
+        self.phases.append((phase, now - self._last))
+        self._last = now
+
+    @property
+    def total(self) -> float:
+        """Time of all the phases together"""
+        return sum(elapsed for _, elapsed in self.phases)
+
+    def report(self, output: TextIO) -> None:
+        """Write the time of each phase and the total in milliseconds"""
+        width: int = max((len(phase) for phase, _ in self.phases), default=0)
+        for phase, elapsed in self.phases:
+            output.write(f"{phase:<{width}}  {elapsed * 1000:8.2f} ms\n")
+        output.write(f"{'total':<{width}}  {self.total * 1000:8.2f} ms\n")
@@ -0,0 +1,229 @@
+"""Module to record games in a compact binary log and play them again"""
+
+from collections.abc import Callable
+import struct
+from types import TracebackType
+from typing import BinaryIO, Iterator, NamedTuple
+from src.Grid import Grid
+from src.Utils import Directions
+
+MAGIC: bytes = b"2KRL"
+VERSION: int = 1
+HEADER: struct.Struct = struct.Struct("<4sBQIB")
+MOVED: int = 0x04
+SPAWNED: int = 0x08
+FOUR: int = 0x10
+END: int = 0xFF
+
+
+class GameRecord(NamedTuple):
+    """
+    A recorded game
+
+    Every event takes two bytes: the flags, with the direction in the two lowest bits and the MOVED,
+    SPAWNED and FOUR bits, and the cell y * size + x of the new tile.
+    """
+
+    seed: int
+    win: int
+    size: int
+    events: bytes
+
+    def directions(self) -> list[Directions]:
+        """The movements of the game in the order they were played"""
+        return [Directions(flags & 3) for flags in self.events[::2] if flags & MOVED]
+
+
+class ReplayWriter:
+    """
+    Write games to a binary stream, the events are kept in memory and written in big chunks
+
+    A game starts with a header with the seed and the settings and ends with the END byte, so logs can
+    be appended to each other. A movement and the tile that follows it share a single event.
+    """
+
+    BUFFER: int = 1 << 16
+
+    def __init__(self, stream: BinaryIO) -> None:
+        self._stream: BinaryIO = stream
+        self._buffer: bytearray = bytearray()
+        self._pending: int | None = None
+        self._playing: bool = False
+
+    def __enter__(self) -> "ReplayWriter":
+        return self
+
+    def __exit__(
+        self, exc_type: type[BaseException] | None, exc_val: BaseException | None, exc_tb: TracebackType | None
+    ) -> None:
+        self.close()
+
+    def startGame(self, seed: int, win: int, size: int) -> None:
+        """Start a new game, the previous one is ended"""
+        if self._playing:
+            self.endGame()
+        self._buffer += HEADER.pack(MAGIC, VERSION, seed, win, size)
+        self._playing = True
+
+    def move(self, direction: Directions) -> None:
+        """Add a movement that has changed the grid"""
+        if self._pending is not None:
+            self._buffer.append(self._pending)
+            self._buffer.append(0)
+        self._pending = MOVED | direction.value
+
+    def spawn(self, cell: int, four: bool) -> None:
+        """Add a new tile in the cell y * size + x, it goes with the last movement"""
+        flags: int = SPAWNED | (FOUR if four else 0)
+        if self._pending is not None:
+            flags |= self._pending
+            self._pending = None
+        self._buffer.append(flags)
+        self._buffer.append(cell)
+        if len(self._buffer) >= self.BUFFER:
+            self.flush()
+
+    def endGame(self) -> None:
+        """Close the current game"""
+        if self._pending is not None:
+            self._buffer.append(self._pending)
+            self._buffer.append(0)
+            self._pending = None
+        self._buffer.append(END)
+        self._playing = False
+
+    def flush(self) -> None:
+        """Write the buffered events to the stream"""
+        if self._buffer:
+            self._stream.write(self._buffer)
+            self._buffer = bytearray()
+
+    def close(self) -> None:
+        """End the current game and write everything, the stream is left open"""
+        if self._playing:
+            self.endGame()
+        self.flush()
+        self._stream.flush()
+
+
+def readGames(stream: BinaryIO, chunk: int = 1 << 20) -> Iterator[GameRecord]:
+    """
+    Read the games of a log, the stream is read in chunks
+
+    Args:
+        stream (BinaryIO): the log
+        chunk (int): number of bytes read at once
+
+    Yields:
+        GameRecord: every game of the log
+    """
+    buffer: bytes = b""
+    position: int = 0
+
+    def more() -> bool:
+        nonlocal buffer, position
+        data: bytes = stream.read(chunk)
+        if not data:
+            return False
+        buffer = buffer[position:] + data
+        position = 0
+        return True
+
+    while True:
+        while len(buffer) - position < HEADER.size:
+            if not more():
+                if len(buffer) > position:
+                    raise ValueError("The replay log ends in the middle of a header")
+                return
+        magic, version, seed, win, size = HEADER.unpack_from(buffer, position)
+        if magic != MAGIC or version != VERSION:
+            raise ValueError("Not a replay log or an unsupported version")
+        position += HEADER.size
+        end: int = 0
+        while True:
+            while position + end >= len(buffer):
+                if not more():
+                    raise ValueError("The replay log ends in the middle of a game")
+            if buffer[position + end] == END:
+                break
+            end += 2
+        yield GameRecord(seed, win, size, buffer[position : position + end])
+        position += end + 1
+
+
+def _applyEvents(grid: Grid, events: bytes, start: int, end: int) -> None:
+    """Apply the events from start to end, counted in events and not in bytes, to a grid"""
+    moves: tuple[Callable[[], bool], ...] = (grid.up, grid.left, grid.down, grid.right)
+    size: int = grid.size
+    for i in range(2 * start, 2 * end, 2):
+        flags: int = events[i]
+        if flags & MOVED:
+            moves[flags & 3]()
+        if flags & SPAWNED:
+            cell: int = events[i + 1]
+            grid.setTile(cell % size, cell // size, 4 if flags & FOUR else 2)
+
+
+def playRecord(record: GameRecord) -> Grid:
+    """
+    Play a recorded game on a Grid with the recorded tiles
+
+    Args:
+        record (GameRecord): the game
+
+    Returns:
+        Grid: the grid after the last event
+    """
+    grid: Grid = Grid(record.size, record.win)
+    _applyEvents(grid, record.events, 0, len(record.events) // 2)
+    return grid
+
+
+class ReplayIndex:
+    """
+    A recorded game with a snapshot of the board every few events
+
+    Going to an event restores the last snapshot before it and plays the events from there, or keeps
+    playing from the current event when it is close enough, so any point of a long game is reached
+    without playing it from the start.
+    """
+
+    def __init__(self, record: GameRecord, every: int = 128, grid: Grid | None = None) -> None:
+        self.record: GameRecord = record
+        self.every: int = every
+        self.grid: Grid = grid if grid is not None else Grid(record.size, record.win)
+        self.grid.win = record.win
+        self.position: int
+        self._keyframes: list[tuple[tuple[int, ...], int]] = []
+
+        self.grid.resize(record.size)
+        for start in range(0, len(self) + 1, every):
+            self._keyframes.append((tuple(value for row in self.grid.grid for value in row), self.grid.score))
+            _applyEvents(self.grid, record.events, start, min(start + every, len(self)))
+        self.position = len(self)
+
+    def __len__(self) -> int:
+        return len(self.record.events) // 2
+
+    def seek(self, position: int) -> Grid:
+        """
+        Put the grid as it was after a number of events
+
+        Args:
+            position (int): number of events played, from 0 to len(self)
+
+        Returns:
+            Grid: the grid of the index
+        """
+        position = min(max(position, 0), len(self))
+        keyframe: int = position // self.every
+        if not keyframe * self.every <= self.position <= position:
+            tiles, score = self._keyframes[keyframe]
+            size: int = self.record.size
+            self.grid.grid = [list(tiles[y * size : (y + 1) * size]) for y in range(size)]
+            self.grid.score = score
+            self.position = keyframe * self.every
+        _applyEvents(self.grid, self.record.events, self.position, position)
+        self.position = position
+        self.grid.finished = self.grid.won
+        return self.grid
@@ -2,16 +2,19 @@
 File with the different screens of the game
 """
 
-from itertools import repeat
+from collections import deque
+import time
 import tkinter as tk
 from tkinter import Event, messagebox, PhotoImage
-from typing import Callable, TYPE_CHECKING, Any
-from random import choice, random
+from typing import Callable, TYPE_CHECKING, Any, Iterable, Mapping
 from abc import ABC, abstractmethod
 import math
 import re
-from src import Grid
-from src.Utils import Color, Directions, Screens, Popouts
+from src.GameState import GameState
+from src.Grid import MAX_SIZE, MIN_SIZE
+from src.History import History
+from src.ReplayLog import GameRecord, ReplayIndex, ReplayWriter
+from src.Utils import Color, Directions, Screens, Popouts, gradient, hueStrip, palette
 
 if TYPE_CHECKING:
     from Game import Game
@@ -45,143 +48,444 @@ class GameScreen(MyScreen):
     The screen with the game
     """
 
-    def __init__(self, parent: tk.Frame, controller: "Game") -> None:
+    def __init__(self, parent: tk.Frame, controller: "Game", state: GameState | None = None) -> None:
         MyScreen.__init__(self, parent, controller)
 
-        self.matrix: Grid.Grid = Grid.Grid()
+        win, base, start, end, size = controller.getSettingsParameters()
+        own: bool = state is None
+        self.state: GameState = state if state is not None else GameState(win, size=size)
+        self.state.grid.track_dirty = True
+        self._recorder: ReplayWriter | None = controller.recorder if own else None
         self.gui_grid: list[list[tk.Label]]
-        self._colors: dict[int, Color]
+        self._labels: list[tk.Label] = []
+        self._shown: list[tuple[str, str, str] | None] = []
+        self._colors: Mapping[int, tuple[str, str]]
+        self._top_color: tuple[str, str]
 
-        self.bind_all("<Key>", self._key)
         self._directions: list[str] = [el.name for el in Directions]
-        self._dir_func: dict[str, Callable[[], bool]] = {
-            direction: function
-            for direction, function in zip(
-                self._directions, [self.matrix.up, self.matrix.left, self.matrix.down, self.matrix.right]
-            )
-        }
+        self._pending: deque[Directions] = deque()
+        self._frame: str | None = None
+        self._last_frame: float = 0
+        self._history: History = History()
 
-        self.win = 2048
-        self.base_color = 165
-        self.start_color = 100
-        self.end_color = 66.4
+        self.base_color = base
+        self.start_color = start
+        self.end_color = end
 
-        self.gui_grid = self._generateTiles()
+        self._layout()
         self.generateColors()
 
-        self.reset()
+        if own and controller.resume is not None:
+            controller.resume.restore(self.state)
+            controller.resume = None
+            self._history.push(*self.state.checkpoint())
+            self.draw(full=True)
+        else:
+            self.reset()
+
+    @property
+    def win(self) -> int:
+        """The tile needed to win the game"""
+        return self.state.win
+
+    @win.setter
+    def win(self, win: int) -> None:
+        self.state.win = win
+
+    @property
+    def size(self) -> int:
+        """Number of tiles per side of the board"""
+        return self.state.size
+
+    @size.setter
+    def size(self, size: int) -> None:
+        if size == self.state.size:
+            return
+        self.state.resize(size)
+        self._history.clear()
+        self._history.push(*self.state.checkpoint())
+        self._layout()
+        self.draw(full=True)
+
+    def _layout(self) -> None:
+        """Lay out the tiles for the current board size"""
+        self.gui_grid = self._generateTiles()
 
     def _generateTiles(self) -> list[list[tk.Label]]:
-        width = 10
-        tiles: list[list[tk.Label]] = [[] for _ in range(4)]
-        for i in range(4):
-            for j in range(4):
-                tile = tk.Label(
+        """
+        Lay out one label per cell, the labels are kept between sizes so they are only created the
+        first time a board needs that many
+        """
+        size: int = self.state.size
+        width: int = max(3, 40 // size)
+        font: tuple[str, int, str] = ("Arial", max(8, 80 // size), "bold")
+        self._shown = [None] * len(self._labels)
+        while len(self._labels) < size * size:
+            self._shown.append(None)
+            self._labels.append(
+                tk.Label(
                     self,
                     text="",
                     foreground="black",
                     background="white",
-                    width=width,
-                    height=width // 2,
                     highlightbackground="black",
                     highlightthickness=1,
-                    font=("Arial", 20, "bold"),
                 )
+            )
+        for label in self._labels[size * size :]:
+            label.grid_remove()
+        tiles: list[list[tk.Label]] = [[] for _ in range(size)]
+        for i in range(size):
+            for j in range(size):
+                tile = self._labels[i * size + j]
+                tile.config(width=width, height=width // 2, font=font)
                 tile.grid(row=i, column=j)
                 tiles[i].append(tile)
         return tiles
 
     def generateColors(self) -> None:
-        """Generate the colors of the tiles"""
-        hue = self.base_color
-        start_lightness = self.start_color
-        end_lightness = self.end_color
-        keys: list[int] = [0, 2]
-        while keys[-1] < self.win:
-            keys.append(keys[-1] * 2)
-        steps: int = len(keys) - 1
-        delta: float = (end_lightness - start_lightness) / steps
-
-        colors: dict[int, Color] = {}
-        for i, key in enumerate(keys):
-            lightness = start_lightness + delta * i
-            colors[key] = Color(hue, 100, lightness)
-        self._colors = colors
-
-    def isEndgame(self) -> bool:
-        """
-        Checks if the player has won
-        """
-        if any(self.win in row for row in self.matrix.grid):
-            return True
-        if any(0 in row for row in self.matrix.grid):
-            return False
-        for y in range(self.matrix.size):
-            for x in range(self.matrix.size):
-                if self.matrix.inside(x + 1, y):
-                    if self.matrix[y][x + 1] == self.matrix[y][x]:
-                        return False
-                if self.matrix.inside(x, y + 1):
-                    if self.matrix[y + 1][x] == self.matrix[y][x]:
-                        return False
-        return True
-
-    def newTile(self) -> None:
-        """
-        Generate a new tile if there is space
-        """
-        if not self.matrix.available_space:
-            return
-
-        empty_cells: list[tuple[int, int]] = []
-        for y in range(self.matrix.size):
-            for x in range(self.matrix.size):
-                if self.matrix.grid[y][x] == 0:
-                    empty_cells.append((x, y))
-        if not empty_cells:
-            return
-        x, y = choice(empty_cells)
-        self.matrix.grid[y][x] = 2 if random() < 0.8 else 4
+        """Get the colors of the tiles for the current theme"""
+        self._colors = palette(self.win, self.base_color, self.start_color, self.end_color)
+        self._top_color = self._colors[max(self._colors)]
+        self.draw(full=True)
 
-    def draw(self) -> None:
+    def draw(self, full: bool = False) -> None:
         """
-        Refresh the state of the game
+        Refresh the state of the game, only the tiles that do not show their value yet are pushed to Tk
+
+        Args:
+            full (bool): check every tile instead of only the ones changed since the last draw
         """
-        for i in range(4):
-            for j in range(4):
-                value: int = self.matrix.grid[i][j]
-                self.gui_grid[i][j].config(
-                    text=("" if value == 0 else str(value)), background=self._colors[value].rgb()
-                )
+        grid = self.state.grid
+        size: int = grid.size
+        cells: list[tuple[int, int]] = grid.takeDirty()
+        if full:
+            cells = [(x, y) for y in range(size) for x in range(size)]
+        for x, y in cells:
+            value: int = grid[y][x]
+            background, foreground = self._colors.get(value, self._top_color)
+            shown: tuple[str, str, str] = ("" if value == 0 else str(value), background, foreground)
+            if self._shown[y * size + x] != shown:
+                self._shown[y * size + x] = shown
+                self.gui_grid[y][x].config(text=shown[0], background=background, foreground=foreground)
 
     def _key(self, event: Event) -> None:
         key: str = event.keysym
-        moved: bool = False
         match key:
             case "Escape":
+                self._runFrame()
                 self.controller.showScreen(Screens.MAIN_MENU)
-                return
             case val if val in self._directions:
-                moved = self._dir_func[val]()
+                self._pending.append(Directions[val])
+                self._scheduleFrame()
+            case "z":
+                self._travel(self._history.undo)
+            case "y":
+                self._travel(self._history.redo)
             case _:
-                pass
+                self._scheduleFrame()
 
-        if self.isEndgame():
+    def _travel(self, step: Callable[[], tuple[int, int, int] | None]) -> None:
+        """
+        Undo or redo a movement, the pending keys are played first
+
+        The replay log can not follow a game that goes back, so the rest of the game is not recorded.
+        """
+        if self._pending:
+            self._runFrame()
+        checkpoint: tuple[int, int, int] | None = step()
+        if checkpoint is None:
+            return
+        self.state.recorder = None
+        self.state.restore(*checkpoint)
+        self.draw()
+        self.controller.saveGame()
+
+    def _scheduleFrame(self) -> None:
+        """
+        Process the keys at the next frame, the keys that arrive before it are played together and
+        drawn once
+        """
+        if self._frame is not None:
+            return
+        wait: float = self._last_frame + 1 / self.controller.fps - time.perf_counter()
+        if wait > 0:
+            self._frame = self.after(round(wait * 1000), self._runFrame)
+        else:
+            self._frame = self.after_idle(self._runFrame)
+
+    def _cancelFrame(self) -> None:
+        if self._frame is not None:
+            self.after_cancel(self._frame)
+            self._frame = None
+
+    def _runFrame(self) -> None:
+        """Play every pending movement and draw the result"""
+        self._cancelFrame()
+        self._last_frame = time.perf_counter()
+        ended: bool = self.state.isEndgame()
+        moves: int = 0
+        while self._pending and not ended:
+            moved: bool = self.state.move(self._pending.popleft())
+            ended = self.state.isEndgame()
+            if moved:
+                moves += 1
+                if not ended:
+                    self.state.newTile()
+                    self._history.push(*self.state.checkpoint())
+
+        if ended:
             self.reset()
+            self.controller.saveGame()
             self.controller.showScreen(Screens.MAIN_MENU)
             return
+        self._showFrame(moves)
+        if moves:
+            self.controller.saveGame()
+
+    def _showFrame(self, moves: int) -> None:  # pylint: disable=W0613
+        """Show the board after a frame in which the given number of movements changed it"""
+        self.draw()
+
+    def reset(self) -> None:
+        """Reset the game, a resumed game is not recorded so recording starts again with the new one"""
+        self._cancelFrame()
+        self._pending.clear()
+        self.state.recorder = self._recorder
+        self.state.reset()
+        self._history.clear()
+        self._history.push(*self.state.checkpoint())
+        self.draw()
+
+
+class AnimatedGameScreen(GameScreen):
+    """
+    The screen with the game drawn on a canvas, where the tiles slide to their new cell
+
+    A frame with a single movement is animated, the board jumps to the result when the frame has
+    several movements or when a key arrives during the animation. A late step of the animation
+    skips ahead to where the tiles should be by then.
+    """
+
+    DURATION: float = 0.1
+    GAP: int = 4
+
+    def __init__(self, parent: tk.Frame, controller: "Game") -> None:
+        self.canvas: tk.Canvas | None = None
+        self._tile: int = 0
+        self._items: list[tuple[int, int]] = []
+        self._sliding: list[tuple[int, int, int, int, int, int]] = []
+        self._blanked: list[tuple[int, int]] = []
+        self._started: float = 0
+        self._tween: str | None = None
+        GameScreen.__init__(self, parent, controller)
+        self.state.grid.record_slides = True
+
+    def _layout(self) -> None:
+        """Size the canvas for the board and create a rectangle and a text per cell"""
+        if self._tween is not None:
+            self.after_cancel(self._tween)
+            self._tween = None
+        self._sliding = []
+        self._blanked = []
+        size: int = self.state.size
+        self._tile = max(24, 400 // size)
+        side: int = size * self._tile + self.GAP
+        if self.canvas is None:
+            self.canvas = tk.Canvas(self, background="black", highlightthickness=0)
+            self.canvas.grid(row=0, column=0)
+        self.canvas.config(width=side, height=side)
+        self.canvas.delete("all")
+        font: tuple[str, int, str] = ("Arial", max(8, 80 // size), "bold")
+        self._items = []
+        for cell in range(size * size):
+            x, y = self._corner(cell % size, cell // size)
+            rectangle: int = self.canvas.create_rectangle(x, y, x + self._tile - self.GAP, y + self._tile - self.GAP)
+            text: int = self.canvas.create_text(x + self._tile // 2, y + self._tile // 2, text="", font=font)
+            self._items.append((rectangle, text))
+        self._shown = [None] * (size * size)
+
+    def _corner(self, x: int, y: int) -> tuple[int, int]:
+        """Top left pixel of a cell"""
+        return (x * self._tile + self.GAP, y * self._tile + self.GAP)
+
+    def draw(self, full: bool = False) -> None:
+        """
+        Refresh the state of the game, only the cells that do not show their value yet are pushed to Tk
 
-        if moved:
-            self.newTile()
+        Args:
+            full (bool): check every cell instead of only the ones changed since the last draw
+        """
+        size: int = self.state.grid.size
+        cells: list[tuple[int, int]] = self.state.grid.takeDirty()
+        if full:
+            cells = [(x, y) for y in range(size) for x in range(size)]
+        self._paint(cells)
+
+    def _paint(self, cells: Iterable[tuple[int, int]]) -> None:
+        """Push to Tk the cells that do not show their value yet"""
+        assert self.canvas is not None
+        grid = self.state.grid
+        size: int = grid.size
+        for x, y in cells:
+            value: int = grid[y][x]
+            background, foreground = self._colors.get(value, self._top_color)
+            shown: tuple[str, str, str] = ("" if value == 0 else str(value), background, foreground)
+            if self._shown[y * size + x] != shown:
+                self._shown[y * size + x] = shown
+                rectangle, text = self._items[y * size + x]
+                self.canvas.itemconfig(rectangle, fill=background)
+                self.canvas.itemconfig(text, text=shown[0], fill=foreground)
+
+    def _key(self, event: Event) -> None:
+        self._finishAnimation()
+        GameScreen._key(self, event)
+
+    def _showFrame(self, moves: int) -> None:
+        """Animate the frames with a single movement, show the others at once"""
+        slides: list[tuple[int, int, int, int, int]] = [
+            slide for slide in self.state.grid.slides if slide[:2] != slide[2:4]
+        ]
+        if moves != 1 or not slides:
+            self.draw()
+            return
+        assert self.canvas is not None
+        size: int = self.state.size
+        empty: tuple[str, str] = self._colors[0]
+        font: tuple[str, int, str] = ("Arial", max(8, 80 // size), "bold")
+        for x_from, y_from, x_to, y_to, value in slides:
+            background, foreground = self._colors.get(value, self._top_color)
+            x, y = self._corner(x_from, y_from)
+            x_end, y_end = self._corner(x_to, y_to)
+            rectangle: int = self.canvas.create_rectangle(
+                x, y, x + self._tile - self.GAP, y + self._tile - self.GAP, fill=background
+            )
+            text: int = self.canvas.create_text(
+                x + self._tile // 2, y + self._tile // 2, text=str(value), fill=foreground, font=font
+            )
+            self._sliding.append((rectangle, text, x, y, x_end, y_end))
+            for x_cell, y_cell in ((x_from, y_from), (x_to, y_to)):
+                cell: int = y_cell * size + x_cell
+                self._shown[cell] = None
+                self._blanked.append((x_cell, y_cell))
+                self.canvas.itemconfig(self._items[cell][0], fill=empty[0])
+                self.canvas.itemconfig(self._items[cell][1], text="")
+        self._started = time.perf_counter()
+        self._tick()
+
+    def _tick(self) -> None:
+        """Move the sliding tiles to where they should be now, a late step skips the missed frames"""
+        assert self.canvas is not None
+        self._tween = None
+        progress: float = min(1, (time.perf_counter() - self._started) / self.DURATION)
+        tile: int = self._tile - self.GAP
+        for rectangle, text, x_from, y_from, x_to, y_to in self._sliding:
+            x: float = x_from + (x_to - x_from) * progress
+            y: float = y_from + (y_to - y_from) * progress
+            self.canvas.coords(rectangle, x, y, x + tile, y + tile)
+            self.canvas.coords(text, x + self._tile // 2, y + self._tile // 2)
+        if progress >= 1:
+            self._finishAnimation()
+        else:
+            self._tween = self.after(round(1000 / self.controller.fps), self._tick)
+
+    def _finishAnimation(self) -> None:
+        """Drop the sliding tiles and show the board after the movement"""
+        if self._tween is not None:
+            self.after_cancel(self._tween)
+            self._tween = None
+        if not self._sliding:
+            return
+        assert self.canvas is not None
+        for rectangle, text, *_ in self._sliding:
+            self.canvas.delete(rectangle, text)
+        self._sliding = []
         self.draw()
+        self._paint(self._blanked)
+        self._blanked = []
 
     def reset(self) -> None:
         """Reset the game"""
-        self.matrix.reset()
-        for _ in repeat(None, 2):
-            self.newTile()
-        self.matrix.updateAvailableSpace()
+        self._finishAnimation()
+        GameScreen.reset(self)
+
+
+class ReplayScreen(GameScreen):
+    """
+    Screen to watch the recorded games, drawn with the tiles of the game screen
+
+    Left and Right go one event back and forward, Page Up and Page Down a keyframe, Home and End to
+    the start and the end, Up and Down to the previous and the next game. The slider goes to any event.
+    """
+
+    def __init__(self, parent: tk.Frame, controller: "Game") -> None:
+        win, _, _, _, size = controller.getSettingsParameters()
+        GameScreen.__init__(self, parent, controller, GameState(win, size=size))
+        self._records: list[GameRecord] = controller.replays
+        self._game: int = 0
+        self._index: ReplayIndex | None = None
+
+        self._slider: tk.Scale = tk.Scale(
+            self, orient=tk.HORIZONTAL, showvalue=False, from_=0, to=0, command=self._slide
+        )
+        self._slider.grid(row=MAX_SIZE, column=0, columnspan=MAX_SIZE, sticky="ew")
+        self._status: tk.Label = tk.Label(self, text="No recorded games", font=("Arial", 12))
+        self._status.grid(row=MAX_SIZE + 1, column=0, columnspan=MAX_SIZE)
+
+        if self._records:
+            self._load(0)
+
+    def _load(self, game: int) -> None:
+        """Index a recorded game and show its end"""
+        self._game = game % len(self._records)
+        record: GameRecord = self._records[self._game]
+        self._index = ReplayIndex(record, grid=self.state.grid)
+        self._slider.config(to=len(self._index))
+        self._layout()
+        self.generateColors()
+        self._seek(len(self._index))
+
+    def _seek(self, position: int) -> None:
+        if self._index is None:
+            return
+        score: int = self._index.seek(position).score
         self.draw()
+        self._slider.set(self._index.position)
+        self._status.config(
+            text=f"Game {self._game + 1}/{len(self._records)}  "
+            f"event {self._index.position}/{len(self._index)}  score {score}"
+        )
+
+    def _slide(self, value: str) -> None:
+        if self._index is not None and int(float(value)) != self._index.position:
+            self._seek(int(float(value)))
+
+    def _key(self, event: Event) -> None:
+        if event.keysym == "Escape":
+            self.controller.showScreen(Screens.MAIN_MENU)
+            return
+        if self._index is None:
+            return
+        position: int = self._index.position
+        match event.keysym:
+            case "Left":
+                self._seek(position - 1)
+            case "Right":
+                self._seek(position + 1)
+            case "Prior":
+                self._seek(position - self._index.every)
+            case "Next":
+                self._seek(position + self._index.every)
+            case "Home":
+                self._seek(0)
+            case "End":
+                self._seek(len(self._index))
+            case "Up":
+                self._load(self._game - 1)
+            case "Down":
+                self._load(self._game + 1)
+            case _:
+                pass
 
 
 class MainMenuScreen(MyScreen):
@@ -210,17 +514,24 @@ class MainMenuScreen(MyScreen):
             command=self._settingsButtonBind,
             font=("Arial", 20),
         ).grid(row=2, column=0)
+        row: int = 3
+        if self.controller.replays:
+            tk.Button(
+                self,
+                text="Watch Replays",
+                command=self._replayButtonBind,
+                font=("Arial", 20),
+            ).grid(row=row, column=0)
+            row += 1
         tk.Button(
             self,
             text="Exit",
             command=self.controller.destroy,
             font=("Arial", 20),
-        ).grid(row=3, column=0)
+        ).grid(row=row, column=0)
 
-        self.grid_rowconfigure(0, weight=1)
-        self.grid_rowconfigure(1, weight=1)
-        self.grid_rowconfigure(2, weight=1)
-        self.grid_rowconfigure(3, weight=1)
+        for i in range(row + 1):
+            self.grid_rowconfigure(i, weight=1)
         self.grid_columnconfigure(0, weight=1)
 
     def _key(self, event: Event) -> None:
@@ -241,6 +552,9 @@ class MainMenuScreen(MyScreen):
     def _settingsButtonBind(self) -> None:
         self.controller.showScreen(Screens.SETTINGS)
 
+    def _replayButtonBind(self) -> None:
+        self.controller.showScreen(Screens.REPLAY)
+
 
 class SettingsScreen(MyScreen):
     """Screen where you can tweek settings"""
@@ -286,18 +600,23 @@ class SettingsScreen(MyScreen):
         self._end_color_entry: tk.Entry = tk.Entry(self, width=10)
         self._end_color_entry.grid(column=2, row=3)
 
+        tk.Label(self, text=f"Board size ({MIN_SIZE}-{MAX_SIZE})").grid(column=0, row=4, columnspan=2)
+        self._size: tk.Entry = tk.Entry(self, width=5)
+        self._size.grid(column=2, row=4)
+
         tk.Button(
             self,
             text="Back",
             font=("Arial", 16),
             command=self._goBackToMainMenu,
-        ).grid(column=0, row=4, columnspan=3)
+        ).grid(column=0, row=5, columnspan=3)
 
         self.grid_rowconfigure(0, weight=1)
         self.grid_rowconfigure(1, weight=1)
         self.grid_rowconfigure(2, weight=1)
         self.grid_rowconfigure(3, weight=1)
         self.grid_rowconfigure(4, weight=1)
+        self.grid_rowconfigure(5, weight=1)
         self.grid_columnconfigure(0, weight=1)
         self.grid_columnconfigure(1, weight=1)
         self.grid_columnconfigure(2, weight=1)
@@ -315,9 +634,11 @@ class SettingsScreen(MyScreen):
 
     def setSettings(self) -> None:
         """Set the settings screen with the current values"""
-        win, base, start, end = self.controller.getSettingsParameters()
+        win, base, start, end, size = self.controller.getSettingsParameters()
         self._win.delete(0, tk.END)
         self._win.insert(0, str(win))
+        self._size.delete(0, tk.END)
+        self._size.insert(0, str(size))
 
         self.setColors(base, start, end)
 
@@ -330,7 +651,8 @@ class SettingsScreen(MyScreen):
         start = float(self._start_color_entry.get()) if start == -1 else start
         end: float = self._correctInput(self._end_color_entry.get())
         end = float(self._end_color_entry.get()) if end == -1 else end
-        self.controller.setGameSettings(win, base, start, end)
+        size: int = self._correctSizeInput(self._size.get())
+        self.controller.setGameSettings(win, base, start, end, size)
 
     def _correctWinInputPower(self, user_input: str) -> int:
         regex: str = r"^\d+(\.\d+)?$"
@@ -341,6 +663,12 @@ class SettingsScreen(MyScreen):
         log: int = int(math.log2(number))
         return 2**log
 
+    def _correctSizeInput(self, user_input: str) -> int:
+        if not user_input.isdigit():
+            self._dialogBox("Input error", "Not a number")
+            return self.controller.getSettingsParameters()[4]
+        return min(max(int(user_input), MIN_SIZE), MAX_SIZE)
+
     def _correctInput(self, user_input: str, limit: int = 100) -> float:
         regex: str = r"^\d+(\.\d+)?$"
         if not bool(re.match(regex, user_input)):
@@ -377,6 +705,9 @@ class SelectColor(tk.Toplevel):
     """Create a new window to select the colors with the mouse"""
 
     _instance = None
+    _hue_image: PhotoImage | None = None
+    WIDTH: int = 512
+    HEIGHT: int = 20
 
     def __init__(self, master: "Game", settings_screen: SettingsScreen, pop_type: Popouts) -> None:
         if SelectColor._instance is not None:
@@ -397,9 +728,9 @@ class SelectColor(tk.Toplevel):
         self._get: dict[Popouts, Callable[[int], None]] = {
             t: func for t, func in zip(Popouts, (self._getBaseWindow, self._getStartWindow, self._getEndWindow))
         }
-        self._selection_image: PhotoImage = PhotoImage(file="data/hue.png").zoom(2, 2)
-        self._width = self._selection_image.width()
-        self._height = self._selection_image.height()
+        self._selection_image: PhotoImage = SelectColor._getHueImage(master)
+        self._width = SelectColor.WIDTH
+        self._height = SelectColor.HEIGHT
         self.resizable(width=False, height=False)
 
         self._setWindow(master)
@@ -418,6 +749,16 @@ class SelectColor(tk.Toplevel):
         self._settings.saveSettings()
         self.destroy()
 
+    @staticmethod
+    def _getHueImage(master: tk.Misc) -> PhotoImage:
+        """Get the strip with every hue, it is only drawn once and shared by every window"""
+        if SelectColor._hue_image is None:
+            image: PhotoImage = PhotoImage(master=master, width=SelectColor.WIDTH, height=SelectColor.HEIGHT)
+            row: str = "{" + " ".join(hueStrip(SelectColor.WIDTH)) + "}"
+            image.put(row, to=(0, 0, SelectColor.WIDTH, SelectColor.HEIGHT))
+            SelectColor._hue_image = image
+        return SelectColor._hue_image
+
     @staticmethod
     def getInstance(master: "Game", settings_screen: SettingsScreen, pop_type: Popouts) -> "SelectColor":
         """Get the window instance if it exists or create one if not"""
@@ -440,7 +781,7 @@ class SelectColor(tk.Toplevel):
         canvas.pack(fill="both", expand=True)
 
     def _setWindow(self, controller: "Game") -> None:
-        self._win, self._base, self._start, self._end = controller.getSettingsParameters()
+        self._win, self._base, self._start, self._end, _ = controller.getSettingsParameters()
 
     def _getBaseWindow(self, x: int) -> None:
         base: int = int(x / self._width * 255)
@@ -461,23 +802,19 @@ class SelectColor(tk.Toplevel):
 class GradientFrame(tk.Canvas):
     """A gradient frame which uses a canvas to draw the background"""
 
+    _images: dict[tuple[str, int, int], PhotoImage] = {}
+
     def __init__(self, top_level: SelectColor, width: int, height: int, color: str) -> None:
         tk.Canvas.__init__(self, master=top_level)
-        r_mid, g_mid, b_mid = tuple(int(color[i : i + 2], 16) for i in (1, 3, 5))
-
-        mid_x = width // 2
-        for x in range(mid_x):
-            ratio = x / mid_x
-            r = int(ratio * r_mid)
-            g = int(ratio * g_mid)
-            b = int(ratio * b_mid)
-            color = f"#{r:02x}{g:02x}{b:02x}"
-            self.create_rectangle(x, 0, x + 1, height, fill=color, outline=color)
-
-        for x in range(mid_x, width):
-            ratio = (x - mid_x) / mid_x
-            r = int((1 - ratio) * r_mid + ratio * 255)
-            g = int((1 - ratio) * g_mid + ratio * 255)
-            b = int((1 - ratio) * b_mid + ratio * 255)
-            color = f"#{r:02x}{g:02x}{b:02x}"
-            self.create_rectangle(x, 0, x + 1, height, fill=color, outline=color)
+        self.create_image(0, 0, anchor=tk.NW, image=self._getImage(top_level, width, height, color))
+
+    @classmethod
+    def _getImage(cls, master: tk.Misc, width: int, height: int, color: str) -> PhotoImage:
+        """Get the gradient image, it is only drawn the first time for each color and size"""
+        key: tuple[str, int, int] = (color, width, height)
+        if key not in cls._images:
+            image: PhotoImage = PhotoImage(master=master, width=width, height=height)
+            row: str = "{" + " ".join(gradient(color, width)) + "}"
+            image.put(row, to=(0, 0, width, height))
+            cls._images[key] = image
+        return cls._images[key]
@@ -0,0 +1,170 @@
+"""Module to save a game in a small binary snapshot and write it in the background"""
+
+import os
+from pathlib import Path
+import struct
+import tempfile
+import threading
+from types import TracebackType
+from typing import NamedTuple
+from src.GameState import GameState
+from src.Grid import MAX_SIZE, MIN_SIZE
+
+MAGIC: bytes = b"2KSV"
+VERSION: int = 1
+FORMAT: struct.Struct = struct.Struct(f"<4sBQQQIBBdd{MAX_SIZE * MAX_SIZE}s")
+AUTOSAVE: Path = Path.home() / ".2048" / "autosave.bin"
+
+
+class Snapshot(NamedTuple):
+    """
+    Everything needed to continue a game: the tiles, the score, where the new tiles stream is and the
+    settings
+
+    It is always FORMAT.size bytes long, the tiles are stored as exponents in a MAX_SIZE x MAX_SIZE
+    block whatever the size of the board.
+    """
+
+    seed: int
+    position: int
+    score: int
+    win: int
+    size: int
+    base_color: int
+    start_color: float
+    end_color: float
+    tiles: tuple[int, ...]
+
+    @classmethod
+    def capture(cls, state: GameState, base_color: int, start_color: float, end_color: float) -> "Snapshot":
+        """Take the snapshot of a game with the color settings"""
+        tiles: tuple[int, ...] = tuple(value for row in state.grid.grid for value in row)
+        return cls(
+            state.seed,
+            state.spawns.position,
+            state.score,
+            state.win,
+            state.size,
+            base_color,
+            start_color,
+            end_color,
+            tiles,
+        )
+
+    def restore(self, state: GameState) -> None:
+        """Continue the game of the snapshot in a state"""
+        state.win = self.win
+        state.reseed(self.seed)
+        state.spawns.seek(self.position)
+        state.setGrid([list(self.tiles[y * self.size : (y + 1) * self.size]) for y in range(self.size)], self.score)
+
+    def pack(self) -> bytes:
+        """The snapshot as bytes"""
+        exponents: bytes = bytes(value.bit_length() - 1 if value else 0 for value in self.tiles)
+        return FORMAT.pack(
+            MAGIC,
+            VERSION,
+            self.seed,
+            self.position,
+            self.score,
+            self.win,
+            self.size,
+            self.base_color,
+            self.start_color,
+            self.end_color,
+            exponents,
+        )
+
+    @classmethod
+    def unpack(cls, data: bytes) -> "Snapshot":
+        """
+        Read a snapshot
+
+        Raises:
+            ValueError: if the data is not a snapshot
+        """
+        if len(data) != FORMAT.size:
+            raise ValueError("Not a snapshot")
+        magic, version, seed, position, score, win, size, base, start, end, exponents = FORMAT.unpack(data)
+        if magic != MAGIC or version != VERSION or not MIN_SIZE <= size <= MAX_SIZE:
+            raise ValueError("Not a snapshot or an unsupported version")
+        tiles: tuple[int, ...] = tuple(1 << exponent if exponent else 0 for exponent in exponents[: size * size])
+        return cls(seed, position, score, win, size, base, start, end, tiles)
+
+
+def loadSnapshot(path: Path = AUTOSAVE) -> Snapshot | None:
+    """The snapshot saved in a file, None if there is none or it can not be read"""
+    try:
+        return Snapshot.unpack(path.read_bytes())
+    except (OSError, ValueError):
+        return None
+
+
+def writeAtomic(path: Path, data: bytes) -> None:
+    """
+    Write a file so that it always has either the old or the new content, every writer has its own
+    temporary file so two running games do not overwrite each other's
+    """
+    path.parent.mkdir(parents=True, exist_ok=True)
+    with tempfile.NamedTemporaryFile(dir=path.parent, prefix=path.name, suffix=".tmp", delete=False) as file:
+        try:
+            file.write(data)
+            file.flush()
+            os.fsync(file.fileno())
+        except OSError:
+            file.close()
+            os.unlink(file.name)
+            raise
+    os.replace(file.name, path)
+
+
+class Autosave:
+    """
+    Write snapshots to a file from a background thread
+
+    Saving only hands the bytes over to the thread. When several snapshots arrive while a file is
+    being written only the last one is written next.
+    """
+
+    def __init__(self, path: Path = AUTOSAVE) -> None:
+        self.path: Path = path
+        self._pending: bytes | None = None
+        self._closed: bool = False
+        self._condition: threading.Condition = threading.Condition()
+        self._thread: threading.Thread = threading.Thread(target=self._run, name="autosave", daemon=True)
+        self._thread.start()
+
+    def __enter__(self) -> "Autosave":
+        return self
+
+    def __exit__(
+        self, exc_type: type[BaseException] | None, exc_val: BaseException | None, exc_tb: TracebackType | None
+    ) -> None:
+        self.close()
+
+    def save(self, data: bytes) -> None:
+        """Write the data as soon as the thread is free, replacing any data still waiting"""
+        with self._condition:
+            self._pending = data
+            self._condition.notify()
+
+    def _run(self) -> None:
+        while True:
+            with self._condition:
+                while self._pending is None and not self._closed:
+                    self._condition.wait()
+                data: bytes | None = self._pending
+                self._pending = None
+            if data is None:
+                return
+            try:
+                writeAtomic(self.path, data)
+            except OSError:
+                pass
+
+    def close(self) -> None:
+        """Write the last data and stop the thread"""
+        with self._condition:
+            self._closed = True
+            self._condition.notify()
+        self._thread.join()
@@ -0,0 +1,45 @@
+"""Module with the random numbers that decide the new tiles of a game"""
+
+from random import Random
+
+
+class SpawnStream:
+    """
+    Random numbers for the new tiles of a game, generated in blocks
+
+    Every new tile takes two numbers in [0, 1): where it goes among the empty cells and if it is a 4.
+    Block k only depends on the seed and k, so the stream can jump to any tile without generating the
+    ones before it, and the same seed always produces the same tiles for the same movements.
+    """
+
+    BLOCK: int = 256
+
+    def __init__(self, seed: int, block: int = BLOCK) -> None:
+        self.seed: int = seed
+        self.block: int = block
+        self.position: int = 0
+        self._loaded: int = -1
+        self._values: list[float] = []
+
+    def _load(self, number: int) -> None:
+        """Generate the numbers of a block"""
+        random = Random(f"{self.seed}:{number}").random
+        self._values = [random() for _ in range(2 * self.block)]
+        self._loaded = number
+
+    def next(self) -> tuple[float, float]:
+        """
+        Take the numbers of the next tile
+
+        Returns:
+            tuple[float, float]: the position among the empty cells and the chance of a 4
+        """
+        number, index = divmod(self.position, self.block)
+        if number != self._loaded:
+            self._load(number)
+        self.position += 1
+        return self._values[2 * index], self._values[2 * index + 1]
+
+    def seek(self, position: int) -> None:
+        """Continue from the given tile, the block is only generated when it is needed"""
+        self.position = position
@@ -0,0 +1,260 @@
+"""Module to play many headless games with a policy, sharded across processes"""
+
+import argparse
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor
+import io
+import json
+from random import Random
+import statistics
+import sys
+import time
+from typing import BinaryIO, Callable, Iterator, NamedTuple, TextIO
+from src.Expectimax import ExpectimaxSolver
+from src.GameState import GameState
+from src.Grid import MAX_SIZE, MIN_SIZE
+from src.MoveTables import CACHE, getTables
+from src.ReplayLog import ReplayWriter
+from src.Utils import Directions
+
+Policy = Callable[[GameState], Directions | None]
+
+
+class GameResult(NamedTuple):
+    """Outcome of a single game"""
+
+    index: int
+    seed: int
+    score: int
+    max_tile: int
+    moves: int
+    elapsed: float
+
+
+def _legalMoves(state: GameState) -> list[Directions]:
+    """Every movement that changes the grid"""
+    mask: int = state.grid.availableMoves()
+    return [direction for direction in Directions if mask >> direction.value & 1]
+
+
+def randomPolicy(state: GameState) -> Directions | None:
+    """Any of the legal movements"""
+    moves: list[Directions] = _legalMoves(state)
+    return state.rng.choice(moves) if moves else None
+
+
+def greedyPolicy(state: GameState) -> Directions | None:
+    """The legal movement with the best immediate score, then with the most empty cells"""
+    best: Directions | None = None
+    best_value: tuple[int, int] = (-1, -1)
+    for direction in _legalMoves(state):
+        rows, score = state.grid.peek(direction)
+        value: tuple[int, int] = (score, sum(row.count(0) for row in rows))
+        if value > best_value:
+            best, best_value = direction, value
+    return best
+
+
+_solver: ExpectimaxSolver | None = None
+
+
+def searchPolicy(state: GameState) -> Directions | None:
+    """The movement chosen by a shallow expectimax search"""
+    global _solver  # pylint: disable=W0603
+    if _solver is None:
+        _solver = ExpectimaxSolver(depth=1)
+    return _solver.bestMove(state.grid)
+
+
+POLICIES: dict[str, Policy] = {
+    "random": randomPolicy,
+    "greedy": greedyPolicy,
+    "search": searchPolicy,
+}
+
+
+def gameSeed(master_seed: int, index: int) -> int:
+    """Seed of a game, it only depends on the master seed and the game index"""
+    return Random(f"{master_seed}:{index}").getrandbits(64)
+
+
+def playGame(
+    index: int,
+    seed: int,
+    policy: str,
+    win: int = 2048,
+    size: int = 4,
+    recorder: ReplayWriter | None = None,
+    bitboard: bool = False,
+) -> GameResult:
+    """
+    Play a game until it is won or stuck
+
+    Args:
+        index (int): number of the game in the tournament
+        seed (int): seed of the game, used for the new tiles and the policy choices
+        policy (str): name of the policy in POLICIES
+        win (int): the tile needed to win the game
+        size (int): number of cells per side of the grid
+        recorder (ReplayWriter | None): where the game is recorded, if any
+        bitboard (bool): play on a BitboardGrid instead of a Grid
+
+    Returns:
+        GameResult: the outcome of the game
+    """
+    start: float = time.perf_counter()
+    choose: Policy = POLICIES[policy]
+    state: GameState = GameState(win=win, seed=seed, size=size, recorder=recorder, bitboard=bitboard)
+    moves: int = 0
+    while not state.isEndgame():
+        direction: Directions | None = choose(state)
+        if direction is None or not state.step(direction):
+            break
+        moves += 1
+    if recorder is not None:
+        recorder.endGame()
+    return GameResult(index, seed, state.score, state.grid.maxTile, moves, time.perf_counter() - start)
+
+
+def _playShard(
+    games: list[tuple[int, int]], policy: str, win: int, size: int, record: bool, bitboard: bool = False
+) -> tuple[list[GameResult], bytes]:
+    """Play some games, with the replay log of all of them if they are recorded"""
+    if not record:
+        return [playGame(index, seed, policy, win, size, bitboard=bitboard) for index, seed in games], b""
+    log: io.BytesIO = io.BytesIO()
+    with ReplayWriter(log) as recorder:
+        results: list[GameResult] = [
+            playGame(index, seed, policy, win, size, recorder, bitboard) for index, seed in games
+        ]
+    return results, log.getvalue()
+
+
+def runTournament(
+    games: int,
+    policy: str,
+    seed: int = 0,
+    workers: int | None = None,
+    win: int = 2048,
+    shard: int = 16,
+    size: int = 4,
+    replay: BinaryIO | None = None,
+    bitboard: bool = False,
+) -> Iterator[GameResult]:
+    """
+    Play the games in a process pool and yield the results as the shards finish, in game order
+
+    Args:
+        games (int): number of games
+        policy (str): name of the policy in POLICIES
+        seed (int): master seed, the same one always produces the same games
+        workers (int | None): number of processes, one per core if None
+        win (int): the tile needed to win each game
+        shard (int): number of games sent to a worker at once
+        size (int): number of cells per side of the grids
+        replay (BinaryIO | None): binary stream where the games are recorded in order, if any
+        bitboard (bool): play on BitboardGrid boards, only for 4x4 grids
+
+    Yields:
+        GameResult: the outcome of each game
+    """
+    if policy not in POLICIES:
+        raise ValueError(f"Unknown policy {policy}, choose from {', '.join(POLICIES)}")
+    if not MIN_SIZE <= size <= MAX_SIZE:
+        raise ValueError(f"The size must be between {MIN_SIZE} and {MAX_SIZE}")
+    if policy == "search" and size != 4:
+        raise ValueError("The search policy only works with 4x4 grids")
+    if bitboard and size != 4:
+        raise ValueError("The bitboard grids only work with 4x4 grids")
+    if policy == "search":
+        getTables(CACHE)
+    seeds: list[tuple[int, int]] = [(index, gameSeed(seed, index)) for index in range(games)]
+    shards: list[list[tuple[int, int]]] = [seeds[i : i + shard] for i in range(0, games, shard)]
+    initializer: Callable[..., object] | None = getTables if policy == "search" else None
+    with ProcessPoolExecutor(max_workers=workers, initializer=initializer, initargs=(CACHE,)) as executor:
+        count: int = len(shards)
+        record: list[bool] = [replay is not None] * count
+        for results, log in executor.map(
+            _playShard, shards, [policy] * count, [win] * count, [size] * count, record, [bitboard] * count
+        ):
+            if replay is not None:
+                replay.write(log)
+            yield from results
+
+
+class Summary:
+    """Aggregated results of a tournament"""
+
+    def __init__(self) -> None:
+        self.scores: list[int] = []
+        self.max_tiles: Counter[int] = Counter()
+        self.moves: int = 0
+        self.elapsed: float = 0
+        self._start: float = time.perf_counter()
+
+    def add(self, result: GameResult) -> None:
+        """Add the outcome of a game"""
+        self.scores.append(result.score)
+        self.max_tiles[result.max_tile] += 1
+        self.moves += result.moves
+        self.elapsed = time.perf_counter() - self._start
+
+    def report(self, output: TextIO) -> None:
+        """Write the throughput and the distributions of scores and max tiles"""
+        games: int = len(self.scores)
+        elapsed: float = self.elapsed or float("inf")
+        output.write(f"games: {games} in {self.elapsed:.2f}s\n")
+        output.write(f"throughput: {games / elapsed:.2f} games/s, {self.moves / elapsed:.1f} moves/s\n")
+        if not games:
+            return
+        output.write(
+            f"score: mean {statistics.fmean(self.scores):.1f}, median {statistics.median(self.scores):.1f}, "
+            f"min {min(self.scores)}, max {max(self.scores)}\n"
+        )
+        output.write("max tile:\n")
+        for tile, count in sorted(self.max_tiles.items()):
+            output.write(f"  {tile:>6}: {count:>8} ({100 * count / games:.1f}%)\n")
+
+
+def writeResult(result: GameResult, output: TextIO) -> None:
+    """Write a game outcome as a JSON line"""
+    output.write(json.dumps(result._asdict()) + "\n")
+
+
+def runCommandLine(argv: list[str] | None = None, prog: str | None = None) -> None:
+    """
+    Play a tournament configured from command line arguments, the summary is written to stdout
+
+    Args:
+        argv (list[str] | None): the arguments, the ones of the process if None
+        prog (str | None): name of the program in the help message
+    """
+    parser = argparse.ArgumentParser(prog=prog, description="Self-play tournament of headless 2048 games")
+    parser.add_argument("--games", type=int, default=100, help="number of games to play")
+    parser.add_argument("--policy", choices=list(POLICIES), default="random", help="how the moves are chosen")
+    parser.add_argument("--seed", type=int, default=0, help="master seed of the games")
+    parser.add_argument("--workers", type=int, default=None, help="worker processes, one per core by default")
+    parser.add_argument("--win", type=int, default=2048, help="tile that ends the game")
+    parser.add_argument("--size", type=int, default=4, help="cells per side of the board")
+    parser.add_argument(
+        "--output", type=argparse.FileType("w"), default=None, help="JSON lines file for each game, - for stdout"
+    )
+    parser.add_argument("--record", type=argparse.FileType("ab"), default=None, help="binary replay log to append to")
+    parser.add_argument("--bitboard", action="store_true", help="play on packed 4x4 boards")
+    args = parser.parse_args(argv)
+
+    summary: Summary = Summary()
+    for result in runTournament(
+        args.games,
+        args.policy,
+        args.seed,
+        args.workers,
+        args.win,
+        size=args.size,
+        replay=args.record,
+        bitboard=args.bitboard,
+    ):
+        summary.add(result)
+        if args.output is not None:
+            writeResult(result, args.output)
+    summary.report(sys.stdout)
@@ -1,6 +1,9 @@
 """Module to have utilities"""
 
+from collections.abc import Mapping
 from enum import Enum
+from functools import lru_cache
+from types import MappingProxyType
 
 
 class Directions(Enum):
@@ -18,6 +21,7 @@ class Screens(Enum):
     GAME = 0
     MAIN_MENU = 1
     SETTINGS = 2
+    REPLAY = 3
 
 
 class Popouts(Enum):
@@ -98,3 +102,69 @@ class Color:
         g = max(0, min(round(g * 256), 255))
         b = max(0, min(round(b * 256), 255))
         return f"#{r:02x}{g:02x}{b:02x}"
+
+
+@lru_cache(maxsize=16)
+def palette(win: int, hue: int, start_lightness: float, end_lightness: float) -> Mapping[int, tuple[str, str]]:
+    """
+    Colors of every tile of a theme, the last themes used are cached
+
+    Args:
+        win (int): the biggest tile that gets its own color
+        hue (int): the base color in the range of [0, 255]
+        start_lightness (float): lightness of the empty tile in the range of [0, 100]
+        end_lightness (float): lightness of the win tile in the range of [0, 100]
+
+    Returns:
+        Mapping[int, tuple[str, str]]: the background and foreground colors of each tile value
+    """
+    keys: list[int] = [0, 2]
+    while keys[-1] < win:
+        keys.append(keys[-1] * 2)
+    steps: int = len(keys) - 1
+    delta: float = (end_lightness - start_lightness) / steps
+
+    colors: dict[int, tuple[str, str]] = {}
+    for i, key in enumerate(keys):
+        lightness: float = start_lightness + delta * i
+        colors[key] = (Color(hue, 100, lightness).rgb(), "black" if lightness >= 50 else "white")
+    return MappingProxyType(colors)
+
+
+def gradient(color: str, width: int) -> list[str]:
+    """
+    Colors of each column of a gradient that goes from black to the color, in the middle, to white
+
+    Args:
+        color (str): the middle color with the format "#rrggbb"
+        width (int): number of columns
+
+    Returns:
+        list[str]: the color of each column with the format "#rrggbb"
+    """
+    r_mid, g_mid, b_mid = tuple(int(color[i : i + 2], 16) for i in (1, 3, 5))
+    mid_x: int = width // 2
+    columns: list[str] = []
+    for x in range(mid_x):
+        ratio: float = x / mid_x
+        columns.append(f"#{int(ratio * r_mid):02x}{int(ratio * g_mid):02x}{int(ratio * b_mid):02x}")
+    for x in range(mid_x, width):
+        ratio = (x - mid_x) / mid_x
+        r: int = int((1 - ratio) * r_mid + ratio * 255)
+        g: int = int((1 - ratio) * g_mid + ratio * 255)
+        b: int = int((1 - ratio) * b_mid + ratio * 255)
+        columns.append(f"#{r:02x}{g:02x}{b:02x}")
+    return columns
+
+
+def hueStrip(width: int) -> list[str]:
+    """
+    Colors of each column of a strip with every hue, at full saturation and half lightness
+
+    Args:
+        width (int): number of columns
+
+    Returns:
+        list[str]: the color of each column with the format "#rrggbb"
+    """
+    return [Color(x * 256 // width, 100, 50).rgb() for x in range(width)]
@@ -0,0 +1,82 @@
+"""Testing the BatchGrid class"""
+
+import copy
+import random
+import unittest
+from src.GameState import GameState
+from src.Grid import Grid
+from src.Utils import Directions
+
+try:
+    import numpy as np
+    from src.BatchGrid import BatchGrid
+except ImportError:
+    np = None  # type: ignore
+
+
+@unittest.skipIf(np is None, "numpy is not installed")
+class TestBatchGrid(unittest.TestCase):
+    """Tests for the BatchGrid class against the reference Grid"""
+
+    def _randomGrid(self, rng: random.Random) -> list[list[int]]:
+        return [[rng.choice((0, 0, 0, 2, 4, 8, 16)) for _ in range(4)] for _ in range(4)]
+
+    def testMatchesGrid(self) -> None:
+        """Test that the batch gives the same boards, moved flags and scores as the Grid class"""
+        rng = random.Random(0)
+        starts = [self._randomGrid(rng) for _ in range(400)]
+        directions = [rng.choice(list(Directions)) for _ in starts]
+        batch: BatchGrid = BatchGrid(len(starts))
+        batch.grid[:] = np.array(starts)
+        moved, scores = batch.move([direction.value for direction in directions])
+
+        reference: Grid = Grid()
+        for i, (start, direction) in enumerate(zip(starts, directions)):
+            reference.reset()
+            reference.grid = copy.deepcopy(start)
+            with self.subTest(grid=start, direction=direction):
+                self.assertEqual(bool(moved[i]), getattr(reference, direction.name.lower())())
+                self.assertEqual(batch[i].tolist(), reference.grid)
+                self.assertEqual(int(scores[i]), reference.score)
+
+    def testNewTiles(self) -> None:
+        """Test that a single tile is added only to the selected boards with space"""
+        batch: BatchGrid = BatchGrid(3, seed=1)
+        batch.grid[2] = 2
+        batch.newTiles(np.array([True, False, True]))
+        self.assertEqual(int((batch[0] != 0).sum()), 1)
+        self.assertTrue(set(batch[0].flatten().tolist()) <= {0, 2, 4})
+        self.assertEqual(int((batch[1] != 0).sum()), 0)
+        self.assertTrue((batch[2] == 2).all())
+
+    def testSeeds(self) -> None:
+        """Test that every board plays the same game as a GameState with its seed"""
+        rng = random.Random(3)
+        batch: BatchGrid = BatchGrid(6, seed=5)
+        states: list[GameState] = [GameState(seed=seed) for seed in batch.seeds]
+        batch.grid[:] = np.array([[list(row) for row in state.grid.grid] for state in states])
+        for spawns, state in zip(batch.spawns, states):
+            spawns.seek(state.spawns.position)
+        for _ in range(100):
+            directions = [rng.choice(list(Directions)) for _ in states]
+            mask = np.array([not state.isEndgame() for state in states])
+            moved, _ = batch.move([direction.value if alive else -1 for direction, alive in zip(directions, mask)])
+            batch.newTiles(moved)
+            for state, direction, alive in zip(states, directions, mask):
+                if alive:
+                    state.step(direction)
+            self.assertEqual(batch.grid.tolist(), [[list(row) for row in state.grid.grid] for state in states])
+        self.assertEqual(batch.score.tolist(), [state.score for state in states])
+
+    def testEndgame(self) -> None:
+        """Test the terminal flags"""
+        batch: BatchGrid = BatchGrid(3, win=64)
+        batch.grid[0] = np.array([[2, 4, 2, 4], [4, 2, 4, 2], [2, 4, 2, 4], [4, 2, 4, 2]])
+        batch.grid[1] = batch.grid[0]
+        batch.grid[1, 0, 0] = 4
+        batch.grid[2, 3, 3] = 64
+        self.assertEqual(batch.isEndgame().tolist(), [True, False, True])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,63 @@
+"""Testing the microbenchmarks"""
+
+import contextlib
+import io
+import time
+import unittest
+from unittest import mock
+from src.Benchmark import CASES, Case, Result, boards, compare, runCase, runCommandLine
+from src.Grid import slideLine
+
+
+class TestBenchmark(unittest.TestCase):
+    """Tests for the benchmark cases and the baseline comparison"""
+
+    def testCorpus(self) -> None:
+        """Test that the boards are the same on every run"""
+        self.assertEqual(boards(), boards())
+        self.assertEqual(len(boards(5, 3)), 3)
+        self.assertNotEqual(boards(seed=1), boards(seed=2))
+
+    def testCases(self) -> None:
+        """Test that every benchmark runs and has a unique name"""
+        self.assertEqual(len({case.name for case in CASES}), len(CASES))
+        for case in CASES:
+            result: Result = runCase(case, repeats=2, warmup=0)
+            self.assertEqual(len(result.rates), 2)
+            self.assertGreater(result.mean, 0)
+            self.assertEqual(result.asDict()["repeats"], 2)
+
+    def testColdMoves(self) -> None:
+        """Test that every repetition of a move starts with the line cache empty"""
+        case: Case = next(case for case in CASES if case.name == "grid.move.left")
+        case.run(case.prepare())
+        case.prepare()
+        self.assertEqual(slideLine.cache_info().currsize, 0)
+
+    def testZeroElapsed(self) -> None:
+        """Test that a run too short for the clock is repeated instead of giving an infinite rate"""
+        ticks = iter([0.0, 0.0, 0.0, 0.5])
+        case: Case = Case("instant", lambda: None, lambda _: None, 10)
+        with mock.patch.object(time, "perf_counter", lambda: next(ticks)):
+            result: Result = runCase(case, repeats=1, warmup=0)
+        self.assertEqual(result.rates, [40.0])
+
+    def testLimitArgument(self) -> None:
+        """Test that a malformed --limit is a usage error"""
+        for limit in ("keypress", "keypress=fast", "=0.5"):
+            with contextlib.redirect_stderr(io.StringIO()), self.assertRaises(SystemExit) as error:
+                runCommandLine(["--filter", "none", "--limit", limit])
+            self.assertEqual(error.exception.code, 2)
+        with contextlib.redirect_stdout(io.StringIO()):
+            self.assertEqual(runCommandLine(["--filter", "none", "--limit", "keypress=0.5"]), 0)
+
+    def testCompare(self) -> None:
+        """Test that only the drops over the threshold are regressions"""
+        baseline = {"a": {"mean": 100.0}, "b": {"mean": 100.0}, "c": {"mean": 100.0}}
+        results = {"a": {"mean": 95.0}, "b": {"mean": 85.0}, "c": {"mean": 70.0}, "new": {"mean": 1.0}}
+        self.assertEqual([line.split(":")[0] for line in compare(results, baseline, 0.1)], ["b", "c"])
+        self.assertEqual([line.split(":")[0] for line in compare(results, baseline, 0.1, {"c": 0.5})], ["b"])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,143 @@
+"""Testing the BitboardGrid class"""
+
+import copy
+import random
+import unittest
+from src.Bitboard import BitboardGrid, pack, transpose, unpack
+from src.GameState import GameState
+from src.Grid import Grid
+from src.Utils import Directions
+
+
+class TestBitboardGrid(unittest.TestCase):
+    """Tests for the BitboardGrid class against the reference Grid"""
+
+    def _randomGrid(self, rng: random.Random) -> list[list[int]]:
+        return [[rng.choice((0, 0, 0, 2, 4, 8, 16, 2048)) for _ in range(4)] for _ in range(4)]
+
+    def testPackUnpack(self) -> None:
+        """Test that packing and unpacking a grid gives back the same grid"""
+        rng = random.Random(0)
+        for _ in range(100):
+            grid = self._randomGrid(rng)
+            self.assertEqual(unpack(pack(grid)), grid)
+
+    def testTranspose(self) -> None:
+        """Test the transposition of a packed board"""
+        rng = random.Random(1)
+        for _ in range(100):
+            grid = self._randomGrid(rng)
+            transposed = [list(column) for column in zip(*grid)]
+            self.assertEqual(unpack(transpose(pack(grid))), transposed)
+
+    def testSetTile(self) -> None:
+        """Test setting a single cell"""
+        grid: BitboardGrid = BitboardGrid()
+        grid.setTile(1, 2, 8)
+        self.assertEqual(grid[2], [0, 8, 0, 0])
+        grid.setTile(1, 2, 0)
+        self.assertEqual(grid.grid, unpack(0))
+
+    def testEmptyCells(self) -> None:
+        """Test the empty cells found from the packed board"""
+        rng = random.Random(3)
+        grid: BitboardGrid = BitboardGrid()
+        for _ in range(100):
+            grid.grid = self._randomGrid(rng)
+            expected = [(x, y) for y, row in enumerate(grid.grid) for x, value in enumerate(row) if value == 0]
+            self.assertEqual(grid.emptyCells(), expected)
+            cell = grid.randomEmptyCell(rng)
+            self.assertEqual(cell is None, not expected)
+            self.assertTrue(cell is None or cell in expected)
+
+    def testEndgameFlags(self) -> None:
+        """Test the max tile, win and stuck flags against the Grid class"""
+        rng = random.Random(4)
+        for win in (8, 64, 2048, 1 << 16):
+            reference: Grid = Grid(win=win)
+            bitboard: BitboardGrid = BitboardGrid(win=win)
+            for _ in range(100):
+                start = self._randomGrid(rng)
+                if rng.random() < 0.5:
+                    start = [[value or rng.choice((2, 4, 8)) for value in row] for row in start]
+                reference.grid = copy.deepcopy(start)
+                bitboard.grid = start
+                with self.subTest(grid=start, win=win):
+                    self.assertEqual(bitboard.maxTile, reference.maxTile)
+                    self.assertEqual(bitboard.won, reference.won)
+                    self.assertEqual(bitboard.stuck, reference.stuck)
+
+    def testPeekAndAvailableMoves(self) -> None:
+        """Test that peek and the legal movements match the Grid class, without changing the board"""
+        rng = random.Random(5)
+        reference: Grid = Grid()
+        bitboard: BitboardGrid = BitboardGrid()
+        for _ in range(300):
+            start = self._randomGrid(rng)
+            reference.grid = copy.deepcopy(start)
+            bitboard.grid = start
+            self.assertEqual(bitboard.availableMoves(), reference.availableMoves())
+            for direction in Directions:
+                board, score = bitboard.peekBoard(direction)
+                rows, points = reference.peek(direction)
+                self.assertEqual(unpack(board), rows)
+                self.assertEqual(score, points)
+                self.assertEqual(bitboard.peek(direction), (rows, points))
+            self.assertEqual(bitboard.grid, start)
+
+    def testMatchesGrid(self) -> None:
+        """Test that every movement gives the same result as the Grid class"""
+        rng = random.Random(2)
+        reference: Grid = Grid()
+        bitboard: BitboardGrid = BitboardGrid()
+        for _ in range(500):
+            start = self._randomGrid(rng)
+            for direction in ("up", "down", "left", "right"):
+                reference.reset()
+                reference.grid = copy.deepcopy(start)
+                bitboard.reset()
+                bitboard.grid = start
+                with self.subTest(grid=start, direction=direction):
+                    moved = getattr(bitboard, direction)()
+                    self.assertEqual(moved, getattr(reference, direction)())
+                    self.assertEqual(bitboard.grid, reference.grid)
+                    self.assertEqual(bitboard.score, reference.score)
+
+    def testGameState(self) -> None:
+        """Test that a seed plays the same game, new tiles and slides included, on both grids"""
+        reference: GameState = GameState(seed=7)
+        bitboard: GameState = GameState(seed=7, bitboard=True)
+        reference.grid.record_slides = bitboard.grid.record_slides = True
+        for i in range(300):
+            direction = list(Directions)[i * 7 % 4]
+            self.assertEqual(bitboard.step(direction), reference.step(direction))
+            self.assertEqual(bitboard.grid.grid, reference.grid.grid)
+            self.assertEqual(sorted(bitboard.grid.slides), sorted(reference.grid.slides))
+            self.assertEqual((bitboard.score, bitboard.isEndgame()), (reference.score, reference.isEndgame()))
+        with self.assertRaises(ValueError):
+            bitboard.resize(5)
+
+    def testDirtyCells(self) -> None:
+        """Test that the changed cells come from comparing with the board of the last call"""
+        grid: BitboardGrid = BitboardGrid()
+        grid.track_dirty = True
+        grid.grid = [[2, 0, 0, 0], [0, 0, 0, 0], [0, 0, 4, 0], [0, 0, 0, 8]]
+        self.assertEqual(len(grid.takeDirty()), 16)
+        self.assertEqual(grid.takeDirty(), [])
+        grid.right()
+        self.assertEqual(sorted(grid.takeDirty()), [(0, 0), (2, 2), (3, 0), (3, 2)])
+        grid[1][1] = 2
+        self.assertEqual(grid.takeDirty(), [(1, 1)])
+
+    def testTileLimit(self) -> None:
+        """Test that a tile over 4 bits is rejected instead of spilling into the next cell"""
+        grid: BitboardGrid = BitboardGrid()
+        with self.assertRaises(ValueError):
+            grid.setTile(0, 0, 1 << 16)
+        with self.assertRaises(ValueError):
+            pack([[1 << 16, 0, 0, 0], [0] * 4, [0] * 4, [0] * 4])
+        self.assertEqual(grid.board, 0)
+
+
+if __name__ == "__main__":
+    unittest.main()
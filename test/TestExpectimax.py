@@ -0,0 +1,42 @@
+"""Testing the ExpectimaxSolver class"""
+
+import copy
+import unittest
+from src.Bitboard import BitboardGrid
+from src.Expectimax import ExpectimaxSolver
+from src.Grid import Grid
+from src.Utils import Directions
+
+
+class TestExpectimaxSolver(unittest.TestCase):
+    """Tests for the ExpectimaxSolver class"""
+
+    def testSingleMove(self) -> None:
+        """Test a position where only one movement is possible"""
+        grid: Grid = Grid()
+        grid.grid = [[2, 4, 2, 0], [4, 2, 4, 0], [2, 4, 2, 0], [4, 2, 4, 0]]
+        solver: ExpectimaxSolver = ExpectimaxSolver(depth=1)
+        self.assertEqual(solver.bestMove(grid), Directions.Right)
+
+    def testNoMove(self) -> None:
+        """Test a position where the grid can not move"""
+        grid: Grid = Grid()
+        grid.grid = [[2, 4, 2, 4], [4, 2, 4, 2], [2, 4, 2, 4], [4, 2, 4, 2]]
+        self.assertIsNone(ExpectimaxSolver().bestMove(grid))
+
+    def testDoesNotModify(self) -> None:
+        """Test that the search does not change the position and counts the nodes"""
+        grid: Grid = Grid()
+        grid.grid = [[2, 2, 0, 0], [0, 4, 0, 0], [0, 0, 8, 0], [0, 0, 0, 2]]
+        start = copy.deepcopy(grid.grid)
+        bitboard: BitboardGrid = BitboardGrid()
+        bitboard.grid = start
+        solver: ExpectimaxSolver = ExpectimaxSolver(depth=2)
+        self.assertEqual(solver.bestMove(grid), solver.bestMove(bitboard))
+        self.assertEqual(grid.grid, start)
+        self.assertGreater(solver.nodes, 0)
+        self.assertGreater(solver.nodesPerSecond, 0)
+
+
+if __name__ == "__main__":
+    unittest.main()
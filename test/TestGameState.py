@@ -0,0 +1,102 @@
+"""Testing the GameState class"""
+
+import subprocess
+import sys
+import unittest
+from src.GameState import GameState, replay
+from src.Utils import Directions
+
+
+class TestGameState(unittest.TestCase):
+    """Tests for the GameState class"""
+
+    def _tiles(self, state: GameState) -> int:
+        return sum(1 for row in state.grid.grid for value in row if value != 0)
+
+    def testReset(self) -> None:
+        """Test that a new game starts with two tiles"""
+        state: GameState = GameState()
+        self.assertEqual(self._tiles(state), 2)
+        self.assertTrue(all(value in (0, 2, 4) for row in state.grid.grid for value in row))
+        self.assertEqual(state.score, 0)
+
+    def testStep(self) -> None:
+        """Test that a movement adds a new tile and a blocked one does not"""
+        state: GameState = GameState()
+        state.grid.grid = [[2, 0, 0, 0], [0, 0, 0, 0], [0, 0, 0, 0], [0, 0, 0, 0]]
+        state.grid.updateAvailableSpace()
+        self.assertFalse(state.step(Directions.Left))
+        self.assertEqual(self._tiles(state), 1)
+        self.assertTrue(state.step(Directions.Right))
+        self.assertEqual(self._tiles(state), 2)
+
+    def testEndgame(self) -> None:
+        """Test the win threshold and the stuck detection"""
+        state: GameState = GameState(win=64)
+        state.grid.grid = [[2, 4, 2, 4], [4, 2, 4, 2], [2, 4, 2, 4], [4, 2, 4, 2]]
+        self.assertTrue(state.isEndgame())
+        state.grid.setTile(0, 0, 4)
+        self.assertFalse(state.isEndgame())
+        state.grid.setTile(0, 0, 64)
+        self.assertTrue(state.isEndgame())
+
+    def testEndgameRowWrite(self) -> None:
+        """Test that a cell written through a row of the grid ends the game"""
+        state: GameState = GameState(win=64, seed=1)
+        self.assertFalse(state.isEndgame())
+        state.grid[3][3] = 64
+        self.assertTrue(state.grid.won)
+        self.assertTrue(state.grid.finished)
+        self.assertTrue(state.isEndgame())
+        state.grid.grid[3][3] = 0
+        self.assertFalse(state.grid.won)
+        self.assertFalse(state.isEndgame())
+        state.setGrid([[2, 4, 2, 4], [4, 2, 4, 2], [2, 4, 2, 4], [4, 2, 4, 0]])
+        self.assertFalse(state.isEndgame())
+        state.grid[3][3] = 8
+        self.assertTrue(state.isEndgame())
+
+    def testResize(self) -> None:
+        """Test that changing the size starts a new game on the new board"""
+        state: GameState = GameState(size=3)
+        self.assertEqual(len(state.grid.grid), 3)
+        state.resize(8)
+        self.assertEqual(state.size, 8)
+        self.assertEqual(len(state.grid.grid[7]), 8)
+        self.assertEqual(self._tiles(state), 2)
+
+    def testRestoreFull(self) -> None:
+        """Test that a merge on a restored full board adds a new tile"""
+        state: GameState = GameState(seed=3)
+        state.setGrid([[2, 2, 4, 8], [4, 8, 16, 32], [8, 16, 32, 64], [16, 32, 64, 128]])
+        board, score, position = state.checkpoint()
+        state.restore(board, score, position)
+        self.assertTrue(state.step(Directions.Left))
+        self.assertEqual(state.grid.emptyCount, 0)
+        self.assertEqual(state.spawns.position, position + 1)
+
+    def testReplay(self) -> None:
+        """Test that a game is played again from its seed and its movements"""
+        state: GameState = GameState(seed=11)
+        played: list[Directions] = []
+        for direction in [Directions.Left, Directions.Up, Directions.Right, Directions.Down] * 25:
+            if state.step(direction):
+                played.append(direction)
+        again: GameState = replay(11, played)
+        self.assertEqual(again.grid.grid, state.grid.grid)
+        self.assertEqual(again.score, state.score)
+        self.assertEqual(again.spawns.position, len(played) + 2)
+        self.assertNotEqual(GameState(seed=12).grid.grid, GameState(seed=11).grid.grid)
+
+    def testNoTkinter(self) -> None:
+        """Test that the rules can be used without importing tkinter"""
+        code: str = (
+            "import sys, src.GameState; "
+            "sys.exit(any(name in sys.modules for name in ('tkinter', 'typing', 'struct', 're', 'src.ReplayLog', "
+            "'src.History')))"
+        )
+        self.assertEqual(subprocess.run([sys.executable, "-c", code], check=False).returncode, 0)
+
+
+if __name__ == "__main__":
+    unittest.main()
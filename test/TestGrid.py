@@ -2,13 +2,18 @@
 
 import copy
 from itertools import repeat
+import random
 import unittest
-from src.Grid import Grid
+from src.Bitboard import BitboardGrid
+from src.Grid import Grid, slideLine, slideTargets
+from src.Utils import Directions
 
 
 class TestGridMove(unittest.TestCase):
     """Tests for the move method in the Grid class"""
 
+    GRID: type[Grid] | type[BitboardGrid] = Grid
+
     def _generateGrid(self) -> list[list[int]]:
         return [[0 for _ in repeat(None, 4)] for _ in repeat(None, 4)]
 
@@ -25,7 +30,7 @@ class TestGridMove(unittest.TestCase):
         top_center = self._generateGrid()
         top_center[0][2] = 2
 
-        grid: Grid = Grid()
+        grid: Grid | BitboardGrid = self.GRID()
         grid.grid[2][2] = 2
 
         grid.up()
@@ -68,7 +73,7 @@ class TestGridMove(unittest.TestCase):
         bottom_left[2][:2] = [2, 4]
         bottom_left[3][:2] = [4, 2]
 
-        grid: Grid = Grid()
+        grid: Grid | BitboardGrid = self.GRID()
         grid.grid = top_right
         grid.down()
         self.assertEqual(grid.grid, bottom_right)
@@ -88,7 +93,7 @@ class TestGridMove(unittest.TestCase):
         end[0][0] = 2
         end[1][0] = 4
 
-        grid: Grid = Grid()
+        grid: Grid | BitboardGrid = self.GRID()
         grid.grid = copy.deepcopy(start)
         grid.up()
         self.assertEqual(grid.grid, end)
@@ -127,7 +132,7 @@ class TestGridMove(unittest.TestCase):
         end = self._generateGrid()
         end[0][0] = 4
 
-        grid: Grid = Grid()
+        grid: Grid | BitboardGrid = self.GRID()
         grid.grid = copy.deepcopy(start)
         grid.left()
         self.assertEqual(grid.grid, end)
@@ -163,7 +168,7 @@ class TestGridMove(unittest.TestCase):
         end[0][0] = 4
         end[0][1] = 2
 
-        grid: Grid = Grid()
+        grid: Grid | BitboardGrid = self.GRID()
         grid.grid = copy.deepcopy(start)
         grid.left()
         with self.subTest(msg="3 left"):
@@ -320,6 +325,40 @@ class TestGridMove(unittest.TestCase):
         with self.subTest(msg="Move before merge down 2"):
             self.assertEqual(grid.grid, end)
 
+    def testNoChainedMergings(self) -> None:
+        """Test that a merged tile does not merge again in the same movement"""
+        start = self._generateGrid()
+        start[0][0] = 4
+        start[0][2] = 4
+        start[0][3] = 8
+        end = self._generateGrid()
+        end[0][0] = 8
+        end[0][1] = 8
+
+        grid: Grid | BitboardGrid = self.GRID()
+        grid.grid = copy.deepcopy(start)
+        grid.left()
+        with self.subTest(msg="left"):
+            self.assertEqual(grid.grid, end)
+
+        start = self._generateGrid()
+        start[0][0] = 8
+        start[1][0] = 4
+        start[2][0] = 4
+        end = self._generateGrid()
+        end[2][0] = 8
+        end[3][0] = 8
+        grid.grid = copy.deepcopy(start)
+        grid.down()
+        with self.subTest(msg="down"):
+            self.assertEqual(grid.grid, end)
+
+
+class TestBitboardGridMove(TestGridMove):
+    """The move tests run on the BitboardGrid class"""
+
+    GRID = BitboardGrid
+
 
 class TestGrid(unittest.TestCase):
     """Test the rest of the class methods"""
@@ -339,6 +378,196 @@ class TestGrid(unittest.TestCase):
         self.assertFalse(grid.inside(0, -1))
         self.assertFalse(grid.inside(0, 4))
 
+    def testEmptyCells(self) -> None:
+        """Test that the index of empty cells follows the movements and the new tiles"""
+        rng = random.Random(0)
+        grid: Grid = Grid()
+        moves = [grid.up, grid.left, grid.down, grid.right]
+        for _ in range(300):
+            cell = grid.randomEmptyCell(rng)
+            if cell is None:
+                grid.reset()
+                continue
+            self.assertEqual(grid[cell[1]][cell[0]], 0)
+            grid.setTile(*cell, rng.choice((2, 4)))
+            rng.choice(moves)()
+            expected = {(x, y) for y, row in enumerate(grid.grid) for x, value in enumerate(row) if value == 0}
+            self.assertEqual(set(grid.emptyCells()), expected)
+            self.assertEqual(len(grid.emptyCells()), len(expected))
+
+    def _hasMoves(self, grid: list[list[int]]) -> bool:
+        for y, row in enumerate(grid):
+            for x, value in enumerate(row):
+                if value == 0:
+                    return True
+                if x + 1 < len(row) and row[x + 1] == value:
+                    return True
+                if y + 1 < len(grid) and grid[y + 1][x] == value:
+                    return True
+        return False
+
+    def testEndgameFlags(self) -> None:
+        """Test that the max tile and the stuck flag follow the movements"""
+        rng = random.Random(1)
+        grid: Grid = Grid(win=64)
+        moves = [grid.up, grid.left, grid.down, grid.right]
+        for _ in range(2000):
+            cell = grid.randomEmptyCell(rng)
+            if cell is not None:
+                grid.setTile(*cell, rng.choice((2, 4)))
+            rng.choice(moves)()
+            self.assertEqual(grid.maxTile, max(max(row) for row in grid.grid))
+            self.assertEqual(grid.won, grid.maxTile >= 64)
+            self.assertEqual(grid.hasMoves, self._hasMoves(grid.grid))
+            self.assertEqual(grid.stuck, not grid.hasMoves)
+            if grid.stuck or grid.won:
+                grid.reset()
+
+    def testPeekAndAvailableMoves(self) -> None:
+        """Test that peek and the legal movements match moving a copy, without changing the grid"""
+        rng = random.Random(2)
+        grid: Grid = Grid()
+        for _ in range(300):
+            start = [[rng.choice((0, 0, 2, 2, 4, 8)) for _ in range(4)] for _ in range(4)]
+            grid.grid = copy.deepcopy(start)
+            mask = grid.availableMoves()
+            for direction in Directions:
+                rows, score = grid.peek(direction)
+                reference: Grid = Grid()
+                reference.grid = copy.deepcopy(start)
+                moved = getattr(reference, direction.name.lower())()
+                with self.subTest(grid=start, direction=direction):
+                    self.assertEqual(rows, reference.grid)
+                    self.assertEqual(score, reference.score)
+                    self.assertEqual(bool(mask >> direction.value & 1), moved)
+            self.assertEqual(grid.grid, start)
+
+    def _slideReference(self, line: list[int]) -> list[int]:
+        result: list[int] = []
+        merged: bool = False
+        for value in line:
+            if value == 0:
+                continue
+            if result and result[-1] == value and not merged:
+                result[-1] *= 2
+                merged = True
+            else:
+                result.append(value)
+                merged = False
+        return result + [0] * (len(line) - len(result))
+
+    def testSizes(self) -> None:
+        """Test the movements on boards from 3x3 up to 16x16"""
+        rng = random.Random(3)
+        for size in (3, 5, 8, 16):
+            grid: Grid = Grid(size)
+            self.assertEqual(len(grid.grid), size)
+            self.assertEqual(len(grid.emptyCells()), size * size)
+            for _ in range(20):
+                start = [[rng.choice((0, 0, 2, 2, 4, 8)) for _ in range(size)] for _ in range(size)]
+                grid.grid = copy.deepcopy(start)
+                grid.left()
+                with self.subTest(size=size, direction="left"):
+                    self.assertEqual(grid.grid, [self._slideReference(row) for row in start])
+                grid.grid = copy.deepcopy(start)
+                grid.down()
+                columns = [self._slideReference(list(column)[::-1])[::-1] for column in zip(*start)]
+                with self.subTest(size=size, direction="down"):
+                    self.assertEqual(grid.grid, [list(row) for row in zip(*columns)])
+                    self.assertEqual(grid.hasMoves, self._hasMoves(grid.grid))
+
+    def testDirtyCells(self) -> None:
+        """Test that only the cells changed by a movement are reported, and every cell when not tracking"""
+        grid: Grid = Grid()
+        grid.grid = [[2, 0, 0, 0], [0, 0, 0, 0], [0, 0, 4, 0], [0, 0, 0, 8]]
+        grid.right()
+        self.assertEqual(len(grid.takeDirty()), 16)
+        self.assertEqual(len(grid.takeDirty()), 16)
+        grid.track_dirty = True
+        grid.grid = [[2, 0, 0, 0], [0, 0, 0, 0], [0, 0, 4, 0], [0, 0, 0, 8]]
+        self.assertEqual(len(grid.takeDirty()), 16)
+        self.assertEqual(grid.takeDirty(), [])
+        grid.right()
+        self.assertEqual(sorted(grid.takeDirty()), [(0, 0), (2, 2), (3, 0), (3, 2)])
+        grid.setTile(1, 1, 2)
+        self.assertEqual(grid.takeDirty(), [(1, 1)])
+
+    def testWinThreshold(self) -> None:
+        """Test that the finished flag uses the configured win tile"""
+        grid: Grid = Grid(win=8)
+        grid.grid = [[4, 4, 0, 0], [0, 0, 0, 0], [0, 0, 0, 0], [0, 0, 0, 0]]
+        self.assertFalse(grid.won)
+        grid.left()
+        self.assertTrue(grid.finished)
+        self.assertTrue(grid.won)
+
+    def testWriteRow(self) -> None:
+        """Test that writing a cell through a row keeps the empty cells and the max tile up to date"""
+        grid: Grid = Grid()
+        grid.grid[0][0] = 2048
+        grid[1][1] = 2
+        self.assertEqual(grid.emptyCount, 14)
+        self.assertEqual(grid.maxTile, 2048)
+        self.assertEqual(grid.emptyCell(0.0), (1, 0))
+        self.assertTrue(grid.left())
+        self.assertEqual(grid.emptyCount, 14)
+        self.assertEqual(grid.grid, [[2048, 0, 0, 0], [2, 0, 0, 0], [0, 0, 0, 0], [0, 0, 0, 0]])
+        rows = copy.deepcopy(grid.grid)
+        rows[0][0] = 4
+        self.assertEqual(grid[0][0], 2048)
+
+    def testEmptyCellOrder(self) -> None:
+        """Test that the cell picked from a number only depends on the tiles"""
+        rng = random.Random(6)
+        for size in (3, 5, 16):
+            grid: Grid = Grid(size=size)
+            moves = [grid.up, grid.left, grid.down, grid.right]
+            for _ in repeat(None, 200):
+                cell = grid.randomEmptyCell(rng)
+                if cell is None:
+                    grid.reset()
+                    continue
+                grid.setTile(*cell, rng.choice((2, 4)))
+                rng.choice(moves)()
+                copied: Grid = Grid(size=size)
+                copied.grid = copy.deepcopy(grid.grid)
+                empty = sorted(grid.emptyCells(), key=lambda cell: (cell[1], cell[0]))
+                for k, expected in enumerate(empty):
+                    fraction = (k + 0.5) / len(empty)
+                    self.assertEqual(grid.emptyCell(fraction), expected)
+                    self.assertEqual(copied.emptyCell(fraction), expected)
+
+    def testSlides(self) -> None:
+        """Test that every tile of the changed lines is followed to its destination"""
+        grid: Grid = Grid()
+        grid.grid = [[2, 2, 0, 4], [0, 0, 0, 0], [0, 8, 0, 0], [0, 0, 0, 8]]
+        grid.right()
+        self.assertEqual(grid.slides, [])
+        grid.record_slides = True
+        grid.grid = [[2, 2, 0, 4], [0, 0, 0, 0], [0, 8, 0, 0], [0, 0, 0, 8]]
+        grid.right()
+        self.assertEqual(
+            sorted(grid.slides),
+            [(0, 0, 2, 0, 2), (1, 0, 2, 0, 2), (1, 2, 3, 2, 8), (3, 0, 3, 0, 4)],
+        )
+        grid.up()
+        self.assertEqual(sorted(grid.slides), [(3, 0, 3, 0, 4), (3, 2, 3, 1, 8), (3, 3, 3, 1, 8)])
+        grid.up()
+        self.assertEqual(grid.slides, [])
+
+    def testSlideTargets(self) -> None:
+        """Test that the tiles sent to each cell add up to the tile slideLine leaves there"""
+        rng = random.Random(5)
+        for _ in repeat(None, 500):
+            line = tuple(rng.choice([0, 0, 2, 4, 8]) for _ in range(rng.randint(3, 8)))
+            result, _ = slideLine(line)
+            sums = [0] * len(line)
+            for k, target in enumerate(slideTargets(line)):
+                self.assertEqual(target < 0, line[k] == 0)
+                if target >= 0:
+                    sums[target] += line[k]
+            self.assertEqual(tuple(sums), result, line)
+
 
 if __name__ == "__main__":
     unittest.main()
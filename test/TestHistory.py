@@ -0,0 +1,90 @@
+"""Testing the History class"""
+
+import random
+import unittest
+from src.Bitboard import MOVES, moveBoard, pack
+from src.GameState import GameState
+from src.History import History, packGrid, unpackGrid
+from src.Utils import Directions
+
+
+class TestHistory(unittest.TestCase):
+    """Tests for the History class"""
+
+    def testUndoRedo(self) -> None:
+        """Test going back and forward and that a new position forgets the undone ones"""
+        history: History = History(capacity=8)
+        self.assertIsNone(history.undo())
+        for board in range(1, 5):
+            history.push(board, board * 10, board * 100)
+        self.assertEqual(history.undo(), (3, 30, 300))
+        self.assertEqual(history.undo(), (2, 20, 200))
+        self.assertEqual(history.redo(), (3, 30, 300))
+        history.push(7)
+        self.assertIsNone(history.redo())
+        self.assertEqual(len(history), 4)
+        self.assertEqual(history.undo(), (3, 30, 300))
+
+    def testCapacity(self) -> None:
+        """Test that the oldest positions are dropped when the buffer is full"""
+        history: History = History(capacity=3)
+        for board in range(10):
+            history.push(board)
+        self.assertEqual(len(history), 3)
+        self.assertEqual([history.undo(), history.undo(), history.undo()], [(8, 0, 0), (7, 0, 0), None])
+        self.assertEqual(history.redo(), (8, 0, 0))
+
+    def testBacktracking(self) -> None:
+        """Test a search that moves packed boards and backtracks with undo"""
+        board: int = pack([[2, 2, 4, 8], [0, 2, 0, 0], [4, 0, 0, 16], [0, 0, 2, 2]])
+        history: History = History(capacity=4)
+        history.push(board)
+        for positive, vertical in MOVES.values():
+            moved, score = moveBoard(board, positive=positive, vertical=vertical)
+            history.push(moved, score)
+            self.assertEqual(history.undo(), (board, 0, 0))
+
+    def testPacking(self) -> None:
+        """Test that a 4x4 board packs into 64 bits like a BitboardGrid and bigger tiles take a byte"""
+        rows = [[2, 2, 4, 8], [0, 2, 0, 0], [4, 0, 0, 1 << 15], [0, 0, 2, 2]]
+        self.assertEqual(packGrid(rows), pack(rows))
+        self.assertLess(packGrid(rows), 1 << 64)
+        self.assertEqual(unpackGrid(packGrid(rows), 4), rows)
+        rows[0][0] = 1 << 40
+        self.assertEqual(unpackGrid(packGrid(rows), 4), rows)
+        big = [[1 << 20 if x == y else 0 for x in range(5)] for y in range(5)]
+        self.assertEqual(unpackGrid(packGrid(big), 5), big)
+
+    def testGameState(self) -> None:
+        """Test that a game restored from a checkpoint goes on like the original"""
+        rng = random.Random(0)
+        state: GameState = GameState(win=1 << 20, seed=9, size=6)
+        for _ in range(300):
+            state.step(rng.choice(list(Directions)))
+        self.assertEqual(unpackGrid(packGrid(state.grid.grid), 6), state.grid.grid)
+        checkpoint = state.checkpoint()
+        directions = [rng.choice(list(Directions)) for _ in range(50)]
+        for direction in directions:
+            state.step(direction)
+        after = (state.grid.grid, state.score)
+        state.restore(*checkpoint)
+        for direction in directions:
+            state.step(direction)
+        self.assertEqual((state.grid.grid, state.score), after)
+        self.assertEqual(state.grid.emptyCount, sum(row.count(0) for row in after[0]))
+
+    def testBitboardRestore(self) -> None:
+        """Test that a BitboardGrid game goes back to a checkpoint by setting its board"""
+        state: GameState = GameState(seed=4, bitboard=True)
+        for i in range(30):
+            state.step(list(Directions)[i % 4])
+        board, score, position = state.checkpoint()
+        self.assertEqual(board, state.grid.board)
+        for i in range(30):
+            state.step(list(Directions)[i % 3])
+        state.restore(board, score, position)
+        self.assertEqual((state.grid.board, state.score, state.spawns.position), (board, score, position))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,33 @@
+"""Testing the MonteCarloPlayer class"""
+
+import unittest
+from src.Grid import Grid
+from src.MonteCarlo import MonteCarloPlayer
+from src.Utils import Directions
+
+
+class TestMonteCarloPlayer(unittest.TestCase):
+    """Tests for the MonteCarloPlayer class"""
+
+    def testNoMove(self) -> None:
+        """Test a position where the grid can not move"""
+        grid: Grid = Grid()
+        grid.grid = [[2, 4, 2, 4], [4, 2, 4, 2], [2, 4, 2, 4], [4, 2, 4, 2]]
+        with MonteCarloPlayer(rollouts=4, workers=2, seed=0) as player:
+            self.assertIsNone(player.bestMove(grid))
+
+    def testReproducible(self) -> None:
+        """Test that the choice only depends on the seed and not on the number of workers"""
+        grid: Grid = Grid()
+        grid.grid = [[2, 2, 0, 0], [0, 4, 0, 0], [0, 0, 8, 0], [0, 0, 0, 2]]
+        with MonteCarloPlayer(rollouts=8, depth=20, workers=2, seed=1) as player:
+            first: Directions | None = player.bestMove(grid)
+        with MonteCarloPlayer(rollouts=8, depth=20, workers=3, seed=1) as player:
+            second: Directions | None = player.bestMove(grid)
+        self.assertIsNotNone(first)
+        self.assertEqual(first, second)
+        self.assertEqual(grid.grid, [[2, 2, 0, 0], [0, 4, 0, 0], [0, 0, 8, 0], [0, 0, 0, 2]])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,70 @@
+"""Testing the precomputed move tables"""
+
+from pathlib import Path
+import tempfile
+import unittest
+from unittest import mock
+from src.MoveTables import MoveTables, getTables, reverseRow
+
+
+def _row(*cells: int) -> int:
+    return sum(cell << (4 * i) for i, cell in enumerate(cells))
+
+
+class TestMoveTables(unittest.TestCase):
+    """Tests for the MoveTables class"""
+
+    def testLeft(self) -> None:
+        """Test some known rows moving to the left"""
+        tables: MoveTables = getTables()
+        self.assertEqual(tables.left[_row(1, 1, 1, 0)], _row(2, 1, 0, 0))
+        self.assertEqual(tables.left[_row(1, 1, 1, 1)], _row(2, 2, 0, 0))
+        self.assertEqual(tables.left[_row(3, 2, 1, 1)], _row(3, 2, 2, 0))
+        self.assertEqual(tables.left[_row(2, 0, 2, 3)], _row(3, 3, 0, 0))
+        self.assertEqual(tables.left[_row(15, 15, 0, 0)], _row(15, 15, 0, 0))
+
+    def testRight(self) -> None:
+        """Test that the right table mirrors the left one"""
+        tables: MoveTables = getTables()
+        for row in range(0, 1 << 16, 97):
+            self.assertEqual(tables.right[row], reverseRow(tables.left[reverseRow(row)]))
+
+    def testScoreAndChanged(self) -> None:
+        """Test the score and the changed flags"""
+        tables: MoveTables = getTables()
+        self.assertEqual(tables.score[_row(1, 1, 1, 1)], 8)
+        self.assertEqual(tables.score[_row(3, 2, 1, 1)], 4)
+        self.assertEqual(tables.score[_row(1, 2, 3, 4)], 0)
+        self.assertFalse(tables.left_changed[_row(1, 2, 0, 0)])
+        self.assertTrue(tables.right_changed[_row(1, 2, 0, 0)])
+
+    def testCache(self) -> None:
+        """Test that the tables written into a file are loaded back"""
+        tables: MoveTables = getTables()
+        with tempfile.TemporaryDirectory() as directory:
+            path: Path = Path(directory) / "tables.bin"
+            tables.save(path)
+            loaded: MoveTables = MoveTables.load(path)
+        self.assertEqual(loaded.left, tables.left)
+        self.assertEqual(loaded.right, tables.right)
+        self.assertEqual(loaded.score, tables.score)
+        self.assertEqual(loaded.left_changed, tables.left_changed)
+        self.assertEqual(loaded.right_changed, tables.right_changed)
+
+    def testBrokenCache(self) -> None:
+        """Test that a cache that can not be read is written again from the tables"""
+        with tempfile.TemporaryDirectory() as directory:
+            path: Path = Path(directory) / "tables.bin"
+            self.assertIs(getTables(path), getTables())
+            self.assertTrue(path.exists())
+            path.write_bytes(path.read_bytes()[:1000])
+            with self.assertRaises(ValueError):
+                MoveTables.load(path)
+            with mock.patch("src.MoveTables._tables", None):
+                rebuilt: MoveTables = getTables(path)
+            self.assertEqual(rebuilt.left, getTables().left)
+            self.assertEqual(MoveTables.load(path).score, rebuilt.score)
+
+
+if __name__ == "__main__":
+    unittest.main()
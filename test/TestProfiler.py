@@ -0,0 +1,37 @@
+"""Testing the startup profiler"""
+
+import io
+import unittest
+from src.Profiler import StartupProfiler
+
+
+class TestStartupProfiler(unittest.TestCase):
+    """Tests for the startup profiler"""
+
+    def testPhases(self) -> None:
+        """Test that every phase lasts since the previous mark"""
+        ticks = iter([1.0, 1.5, 1.75, 3.0])
+        profiler = StartupProfiler(clock=lambda: next(ticks))
+        profiler.mark("tk init")
+        profiler.mark("build main_menu")
+        profiler.mark("first draw")
+        self.assertEqual(profiler.phases, [("tk init", 0.5), ("build main_menu", 0.25), ("first draw", 1.25)])
+        self.assertEqual(profiler.total, 2.0)
+
+    def testReport(self) -> None:
+        """Test that the report has one line per phase and the total"""
+        ticks = iter([0.0, 0.002, 0.005])
+        profiler = StartupProfiler(clock=lambda: next(ticks))
+        profiler.mark("tk init")
+        profiler.mark("first draw")
+        output = io.StringIO()
+        profiler.report(output)
+        lines = output.getvalue().splitlines()
+        self.assertEqual(len(lines), 3)
+        self.assertTrue(lines[0].startswith("tk init"))
+        self.assertTrue(lines[2].startswith("total"))
+        self.assertIn("5.00 ms", lines[2])
+
+
+if __name__ == "__main__":
+    unittest.main()
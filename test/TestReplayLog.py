@@ -0,0 +1,75 @@
+"""Testing the replay log"""
+
+import io
+import unittest
+from src.GameState import GameState, replay
+from src.Grid import Grid
+from src.ReplayLog import HEADER, ReplayIndex, ReplayWriter, playRecord, readGames
+from src.Utils import Directions
+
+
+class TestReplayLog(unittest.TestCase):
+    """Tests for the replay log writer and reader"""
+
+    def _play(self, state: GameState, moves: int) -> None:
+        directions: list[Directions] = [Directions.Left, Directions.Up, Directions.Right, Directions.Down]
+        for i in range(moves):
+            state.step(directions[i % 4])
+
+    def testRoundTrip(self) -> None:
+        """Test that the recorded games are played again to the same grids"""
+        log = io.BytesIO()
+        states: list[GameState] = []
+        with ReplayWriter(log) as recorder:
+            for seed, size in ((1, 4), (2, 3), (3, 16)):
+                state = GameState(win=256, seed=seed, size=size, recorder=recorder)
+                self._play(state, 60)
+                states.append(state)
+        log.seek(0)
+        games = list(readGames(log, chunk=7))
+        log.seek(0)
+        self.assertEqual(list(readGames(log, chunk=1)), games)
+        self.assertEqual([(game.seed, game.win, game.size) for game in games], [(1, 256, 4), (2, 256, 3), (3, 256, 16)])
+        for game, state in zip(games, states):
+            grid = playRecord(game)
+            self.assertEqual(grid.grid, state.grid.grid)
+            self.assertEqual(grid.score, state.score)
+            self.assertEqual(replay(game.seed, game.directions(), game.win, game.size).grid.grid, state.grid.grid)
+
+    def testSize(self) -> None:
+        """Test that every movement with its new tile takes two bytes"""
+        log = io.BytesIO()
+        with ReplayWriter(log) as recorder:
+            state = GameState(seed=4, recorder=recorder)
+            self._play(state, 10)
+        self.assertEqual(len(log.getvalue()), HEADER.size + 2 * state.spawns.position + 1)
+
+    def testIndex(self) -> None:
+        """Test that seeking shows the same grid as playing the game up to that event"""
+        log = io.BytesIO()
+        with ReplayWriter(log) as recorder:
+            self._play(GameState(win=4096, seed=6, size=5, recorder=recorder), 200)
+        game = next(readGames(io.BytesIO(log.getvalue())))
+        states: list[tuple[list[list[int]], int]] = []
+        for events in range(len(game.events) // 2 + 1):
+            grid: Grid = playRecord(game._replace(events=game.events[: 2 * events]))
+            states.append((grid.grid, grid.score))
+        index = ReplayIndex(game, every=16)
+        self.assertEqual(len(index), len(states) - 1)
+        for position in (len(index), 0, 1, 17, 16, 15, 40, 41, 33, len(index) - 1, 100):
+            grid = index.seek(position)
+            self.assertEqual((grid.grid, grid.score), states[position], position)
+
+    def testTruncated(self) -> None:
+        """Test that a log cut in the middle of a game is rejected"""
+        log = io.BytesIO()
+        with ReplayWriter(log) as recorder:
+            self._play(GameState(seed=5, recorder=recorder), 10)
+        with self.assertRaises(ValueError):
+            list(readGames(io.BytesIO(log.getvalue()[:-3])))
+        with self.assertRaises(ValueError):
+            list(readGames(io.BytesIO(b"not a log" * 3)))
+
+
+if __name__ == "__main__":
+    unittest.main()
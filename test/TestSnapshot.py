@@ -0,0 +1,62 @@
+"""Testing the game snapshots"""
+
+from pathlib import Path
+import tempfile
+import unittest
+from src.GameState import GameState
+from src.Snapshot import FORMAT, Autosave, Snapshot, loadSnapshot
+from src.Utils import Directions
+
+
+class TestSnapshot(unittest.TestCase):
+    """Tests for the snapshots and the autosave"""
+
+    def _play(self, state: GameState, moves: int) -> None:
+        for i in range(moves):
+            state.step(list(Directions)[i % 4])
+
+    def testRoundTrip(self) -> None:
+        """Test that a restored game goes on exactly like the original one"""
+        state: GameState = GameState(win=512, seed=21, size=5)
+        self._play(state, 40)
+        data: bytes = Snapshot.capture(state, 10, 90.5, 30.25).pack()
+        self.assertEqual(len(data), FORMAT.size)
+        snapshot: Snapshot = Snapshot.unpack(data)
+        self.assertEqual(snapshot[3:8], (512, 5, 10, 90.5, 30.25))
+
+        restored: GameState = GameState()
+        snapshot.restore(restored)
+        self.assertEqual(restored.grid.grid, state.grid.grid)
+        self.assertEqual((restored.score, restored.win, restored.size), (state.score, 512, 5))
+        self._play(state, 40)
+        self._play(restored, 40)
+        self.assertEqual(restored.grid.grid, state.grid.grid)
+
+    def testSeedRange(self) -> None:
+        """Test that seeds out of 64 bits are reduced so the snapshot can hold them"""
+        for seed in (-1, 1 << 70):
+            state: GameState = GameState(seed=seed)
+            self.assertEqual(state.seed, seed & ((1 << 64) - 1))
+            self.assertEqual(Snapshot.unpack(Snapshot.capture(state, 0, 0, 0).pack()).seed, state.seed)
+            self.assertEqual(state.grid.grid, GameState(seed=state.seed).grid.grid)
+
+    def testAutosave(self) -> None:
+        """Test that the last snapshot saved is the one in the file"""
+        with tempfile.TemporaryDirectory() as directory:
+            path: Path = Path(directory) / "saves" / "autosave.bin"
+            self.assertIsNone(loadSnapshot(path))
+            state: GameState = GameState(seed=2)
+            with Autosave(path) as autosave:
+                for _ in range(20):
+                    self._play(state, 1)
+                    autosave.save(Snapshot.capture(state, 165, 100, 66.4).pack())
+            snapshot = loadSnapshot(path)
+            assert snapshot is not None
+            self.assertEqual(snapshot.position, state.spawns.position)
+            self.assertEqual(list(path.parent.iterdir()), [path])
+            path.write_bytes(b"broken")
+            self.assertIsNone(loadSnapshot(path))
+
+
+if __name__ == "__main__":
+    unittest.main()
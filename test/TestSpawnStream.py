@@ -0,0 +1,31 @@
+"""Testing the SpawnStream class"""
+
+import unittest
+from src.SpawnStream import SpawnStream
+
+
+class TestSpawnStream(unittest.TestCase):
+    """Tests for the SpawnStream class"""
+
+    def testReproducible(self) -> None:
+        """Test that the numbers only depend on the seed"""
+        stream, other = SpawnStream(7, block=4), SpawnStream(7, block=4)
+        values = [stream.next() for _ in range(10)]
+        self.assertEqual(values, [other.next() for _ in range(10)])
+        self.assertEqual(values[0], SpawnStream(7).next())
+        self.assertNotEqual(values, [SpawnStream(8, block=4).next() for _ in range(10)])
+        self.assertTrue(all(0 <= value < 1 for pair in values for value in pair))
+
+    def testSeek(self) -> None:
+        """Test that jumping to a tile gives the same numbers as getting there one by one"""
+        stream = SpawnStream(3, block=4)
+        values = [stream.next() for _ in range(11)]
+        self.assertEqual(stream.position, 11)
+        for position in (9, 0, 4, 10):
+            stream.seek(position)
+            self.assertEqual(stream.next(), values[position])
+            self.assertEqual(stream.position, position + 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,56 @@
+"""Testing the tournament runner"""
+
+import io
+import json
+import subprocess
+import sys
+import unittest
+from src.Tournament import GameResult, Summary, runTournament
+
+
+class TestTournament(unittest.TestCase):
+    """Tests for the tournament runner"""
+
+    def _games(self, workers: int) -> list[tuple[int, int, int, int, int]]:
+        return [result[:5] for result in runTournament(6, "greedy", seed=3, workers=workers, win=256, shard=2)]
+
+    def testReproducible(self) -> None:
+        """Test that the games only depend on the master seed and not on the number of workers"""
+        first = self._games(1)
+        self.assertEqual([game[0] for game in first], list(range(6)))
+        self.assertEqual(first, self._games(3))
+
+    def testUnknownPolicy(self) -> None:
+        """Test that an unknown policy is rejected"""
+        with self.assertRaises(ValueError):
+            next(runTournament(1, "unknown"))
+
+    def testSummary(self) -> None:
+        """Test the aggregated report"""
+        summary: Summary = Summary()
+        summary.add(GameResult(0, 1, 100, 64, 10, 0.1))
+        summary.add(GameResult(1, 2, 300, 128, 30, 0.1))
+        output = io.StringIO()
+        summary.report(output)
+        self.assertEqual(summary.moves, 40)
+        self.assertIn("mean 200.0", output.getvalue())
+        self.assertIn("64:        1 (50.0%)", output.getvalue())
+
+    def testHeadlessGame(self) -> None:
+        """Test that 2048.py plays headless games without importing tkinter"""
+        code: str = (
+            "import runpy, sys; "
+            "sys.argv = ['2048.py', '--headless', '--games', '2', '--policy', 'greedy', '--win', '64', "
+            "'--workers', '1', '--output', '-']; "
+            "runpy.run_path('2048.py', run_name='__main__'); "
+            "sys.exit('tkinter' in sys.modules)"
+        )
+        result = subprocess.run([sys.executable, "-c", code], capture_output=True, text=True, check=False)
+        self.assertEqual(result.returncode, 0, result.stderr)
+        lines: list[str] = result.stdout.splitlines()
+        self.assertEqual([json.loads(line)["index"] for line in lines[:2]], [0, 1])
+        self.assertTrue(lines[2].startswith("games: 2"))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,52 @@
+"""Testing the utilities"""
+
+import unittest
+from src.Utils import Color, gradient, hueStrip, palette
+
+
+class TestPalette(unittest.TestCase):
+    """Tests for the tile palette"""
+
+    def testColors(self) -> None:
+        """Test the tiles of a theme and their colors"""
+        colors = palette(64, 165, 100, 20)
+        self.assertEqual(list(colors), [0, 2, 4, 8, 16, 32, 64])
+        self.assertEqual(colors[0], (Color(165, 100, 100).rgb(), "black"))
+        self.assertEqual(colors[64], (Color(165, 100, 20).rgb(), "white"))
+
+    def testCache(self) -> None:
+        """Test that a theme is only computed once and can not be modified"""
+        colors = palette(2048, 10, 90, 60)
+        self.assertIs(palette(2048, 10, 90, 60), colors)
+        self.assertIsNot(palette(2048, 11, 90, 60), colors)
+        with self.assertRaises(TypeError):
+            colors[2] = ("#000000", "white")  # type: ignore
+
+
+class TestGradient(unittest.TestCase):
+    """Tests for the gradient of the tone picker"""
+
+    def testGradient(self) -> None:
+        """Test that the gradient goes from black to the color to white"""
+        columns = gradient("#40c080", 100)
+        self.assertEqual(len(columns), 100)
+        self.assertEqual(columns[0], "#000000")
+        self.assertEqual(columns[50], "#40c080")
+        self.assertEqual(columns[25], "#206040")
+        self.assertTrue(columns[-1] > "#f8f8f8")
+
+
+class TestHueStrip(unittest.TestCase):
+    """Tests for the strip of the base color picker"""
+
+    def testHueStrip(self) -> None:
+        """Test that every column has the hue of its position"""
+        columns = hueStrip(512)
+        self.assertEqual(len(columns), 512)
+        self.assertEqual(columns[0], "#ff0000")
+        self.assertEqual(columns[1], "#ff0000")
+        self.assertEqual(columns[256], Color(128, 100, 50).rgb())
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,12 @@
+"""Self-play tournament of headless 2048 games"""
+
+from src.Tournament import runCommandLine
+
+
+def main() -> None:
+    """Entry point of the tournament"""
+    runCommandLine()
+
+
+if __name__ == "__main__":
+    main()